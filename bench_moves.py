@@ -0,0 +1,116 @@
+import argparse
+import random
+import time
+
+from ludo_game import LudoGame
+from ludo_rules import START_POSITIONS
+
+
+legacy_log = []
+
+
+def legacy_move_piece(game, player, piece_idx, steps):
+    # The per-call arithmetic and capture scan move_piece used before MOVE_TABLE
+    current_position = player.pieces[piece_idx]
+    player_color = player.color
+    start_pos = game.start_positions[player_color]
+    home_stretch = game.home_stretch_positions[player_color]
+
+    if current_position == 0:
+        if steps == 6:
+            player.pieces[piece_idx] = start_pos
+            legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved out of base to start position.")
+            return {"moved": True, "next_player": False}
+        else:
+            legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} needs a 6 to move out of base.")
+            return {"moved": False, "next_player": True}
+
+    board_path = list(range(1, game.board_size + 1))
+    new_position = current_position + steps
+
+    if new_position > game.board_size:
+        if new_position > (game.board_size + 6):
+            legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} cannot move beyond home with {steps}.")
+            return {"moved": False, "next_player": steps != 6}
+
+        player.pieces[piece_idx] = new_position
+        if new_position == (game.board_size + 6):
+            player.finished_pieces += 1
+            player.pieces[piece_idx] = 100
+            legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} reached home!")
+            if player.finished_pieces == 4:
+                game.game_over = True
+                legacy_log.append(f"Game Over! {player.name} wins!")
+            return {"moved": True, "finished": True, "next_player": steps != 6}
+
+        legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved to {new_position} (home stretch).")
+        return {"moved": True, "next_player": steps != 6}
+
+    player.pieces[piece_idx] = new_position
+    legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved to {new_position}.")
+    for opponent in game.players:
+        if opponent.color != player_color:
+            for opp_piece_idx, opp_pos in enumerate(opponent.pieces):
+                if opp_pos == new_position and new_position != start_pos:
+                    opponent.pieces[opp_piece_idx] = 0
+                    legacy_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} landed on {opponent.name}'s {opponent.color} piece {opp_piece_idx+1}, sending it back to base!")
+    return {"moved": True, "next_player": steps != 6}
+
+
+def random_position(rng):
+    game = LudoGame()
+    for player in game.players:
+        start_pos = START_POSITIONS[player.color]
+        choices = [0, 100] + list(range(start_pos, 58))
+        for piece_idx in range(4):
+            player.pieces[piece_idx] = rng.choice(choices)
+        player.finished_pieces = sum(position == 100 for position in player.pieces)
+    return game.state
+
+
+def make_samples(n, seed):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        state = random_position(rng)
+        samples.append((state, rng.randrange(4), rng.randrange(4), rng.randint(1, 6)))
+    return samples
+
+
+def time_moves(samples, move):
+    games = [LudoGame(state=state.clone(), log_size=None) for state, _, _, _ in samples]
+    legacy_log.clear()
+    started = time.perf_counter()
+    for game, (_, seat, piece_idx, roll) in zip(games, samples):
+        move(game, game.players[seat], piece_idx, roll)
+    elapsed = time.perf_counter() - started
+    return games, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare per-move cost of the legacy and table-driven move_piece.")
+    parser.add_argument("-n", "--moves", type=int, default=200000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    samples = make_samples(args.moves, args.seed)
+    table_move = lambda game, player, piece_idx, roll: game.move_piece(player, piece_idx, roll)
+
+    legacy_best = table_best = float("inf")
+    for _ in range(args.repeat):
+        legacy_games, elapsed = time_moves(samples, legacy_move_piece)
+        legacy_best = min(legacy_best, elapsed)
+        table_games, elapsed = time_moves(samples, table_move)
+        table_best = min(table_best, elapsed)
+
+    mismatches = sum(a.state != b.state for a, b in zip(legacy_games, table_games))
+    legacy_ns = legacy_best / args.moves * 1e9
+    table_ns = table_best / args.moves * 1e9
+    print(f"legacy move_piece: {legacy_ns:8.0f} ns/move")
+    print(f"table  move_piece: {table_ns:8.0f} ns/move ({legacy_ns / table_ns:.2f}x)")
+    print(f"positions that differ: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import random
+import time
+from collections import OrderedDict
+
+from ludo_rules import FINISHED_POSITION, START_POSITIONS, TRACK_LENGTHS
+from ludo_state import CURRENT, PIECES, SIXES
+
+
+WIN_SCORE = 100.0
+BASE_PENALTY = 0.15 # A piece in base still needs a 6 before it can make progress
+
+
+def _zobrist_keys(seed=0x1ad0):
+    rng = random.Random(seed)
+    pieces = [[rng.getrandbits(64) for _ in range(FINISHED_POSITION + 1)] for _ in range(16)]
+    turn = [rng.getrandbits(64) for _ in range(4)]
+    sixes = [[rng.getrandbits(64) for _ in range(3)] for _ in range(4)]
+    return pieces, turn, sixes
+
+
+ZOBRIST_PIECES, ZOBRIST_TURN, ZOBRIST_SIXES = _zobrist_keys()
+
+
+def zobrist_hash(state):
+    # The 16 piece positions, the seat to move and every seat's six streak
+    # (decides whether another 6 forfeits the turn; a passed turn does not
+    # reset it, so the other seats' streaks carry over)
+    data = state.data
+    key = ZOBRIST_TURN[data[CURRENT]]
+    for slot in range(16):
+        key ^= ZOBRIST_PIECES[slot][data[PIECES + slot]]
+    for seat in range(4):
+        key ^= ZOBRIST_SIXES[seat][data[SIXES + seat]]
+    return key
+
+
+def evaluate(game):
+    # Per-seat progress: each piece scores the fraction of its track covered
+    scores = []
+    for seat, player in enumerate(game.players):
+        if player.all_pieces_finished():
+            scores.append(WIN_SCORE)
+            continue
+        start_pos = START_POSITIONS[player.color]
+        score = 0.0
+        for position in player.pieces:
+            if position == 0:
+                score -= BASE_PENALTY
+            elif position == FINISHED_POSITION:
+                score += 1.2
+            else:
+                score += (position - start_pos + 1) / TRACK_LENGTHS[seat]
+        scores.append(score)
+    return tuple(scores)
+
+
+def advantage(values, seat):
+    # How far a seat is ahead of its strongest opponent
+    return values[seat] - max(value for i, value in enumerate(values) if i != seat)
+
+
+class TranspositionTable:
+    # Size-bounded map from Zobrist key to (depth, values), least recently used evicted first
+    def __init__(self, max_entries=200000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, depth):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, depth, values):
+        entries = self.entries
+        entries[key] = (depth, values)
+        entries.move_to_end(key)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class ExpectimaxPlayer:
+    # Expectimax over dice rolls (chance nodes) and piece choices (max-n decision
+    # nodes: every seat picks the move that best improves its own advantage).
+    # Plugs in wherever a policy(game, movable) -> piece index is expected.
+    def __init__(self, time_budget=0.5, max_depth=8, tt_size=200000):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.table = TranspositionTable(tt_size)
+        self.nodes = 0
+        self.last_depth = 0
+
+    def __call__(self, game, movable):
+        if len(movable) == 1:
+            return movable[0]
+
+        seat = game.current_player_idx
+        roll = game.last_roll
+        deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        game = game.clone() # Searched in place with make/unmake; a timeout may leave it mid-line
+        best = movable[0]
+        # Iterative deepening: keep the choice from the deepest fully searched depth
+        for depth in range(1, self.max_depth + 1):
+            try:
+                best = self._root(game, seat, roll, movable, depth, deadline)
+            except SearchTimeout:
+                break
+            self.last_depth = depth
+        return best
+
+    def _root(self, game, seat, roll, movable, depth, deadline):
+        best_piece, best_score = None, None
+        for piece_idx in movable:
+            undo = game.make_move(piece_idx, roll)
+            score = advantage(self._chance(game, depth - 1, deadline), seat)
+            game.unmake_move(undo)
+            if best_score is None or score > best_score:
+                best_piece, best_score = piece_idx, score
+        return best_piece
+
+    def _chance(self, game, depth, deadline):
+        if game.is_game_over() or depth <= 0:
+            return evaluate(game)
+
+        self.nodes += 1
+        if not self.nodes & 255 and time.perf_counter() > deadline:
+            raise SearchTimeout()
+
+        key = zobrist_hash(game.state)
+        values = self.table.get(key, depth)
+        if values is not None:
+            return values
+
+        totals = [0.0, 0.0, 0.0, 0.0]
+        for roll in range(1, 7):
+            undo = game.make_roll(roll)
+            if game.last_roll is None: # Third six, the turn is lost
+                values = self._chance(game, depth - 1, deadline)
+            else:
+                values = self._decide(game, roll, depth, deadline)
+            game.unmake_move(undo) # Also undoes a pass made by _decide
+            for seat in range(4):
+                totals[seat] += values[seat]
+        values = tuple(total / 6 for total in totals)
+        self.table.put(key, depth, values)
+        return values
+
+    def _decide(self, game, roll, depth, deadline):
+        seat = game.current_player_idx
+        movable = game.legal_moves(roll)
+        if not movable:
+            game.last_roll = None
+            game.next_player()
+            return self._chance(game, depth - 1, deadline)
+
+        best_values, best_score = None, None
+        for piece_idx in movable:
+            undo = game.make_move(piece_idx, roll)
+            values = self._chance(game, depth - 1, deadline)
+            game.unmake_move(undo)
+            score = advantage(values, seat)
+            if best_score is None or score > best_score:
+                best_values, best_score = values, score
+        return best_values
@@ -0,0 +1,294 @@
+import argparse
+import contextlib
+import json
+import platform
+import random
+import sys
+import time
+import tkinter as tk
+from tkinter import messagebox
+
+from ludo_dice import BatchedDice, SeededDice
+from ludo_game import LudoGame
+from ludo_gui import LudoGUI, rasterize_rectangles
+from ludo_sim import RandomPolicy, play_game, play_turn
+from ludo_rules import START_POSITIONS
+from ludo_trace import percentile
+
+
+THRESHOLD = 0.10 # Relative slowdown that compare() reports as a regression
+
+
+# --- Display-free stand-ins for the Tk widgets LudoGUI uses ---
+
+class RecordingWidget:
+    # Accepts any widget method, counts calls and hands out canvas item ids
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        self.items = 0
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.calls += 1
+            if name.startswith("create_"):
+                self.items += 1
+                return self.items
+            return ""
+        return record
+
+
+class RecordingMaster(RecordingWidget):
+    def after(self, delay_ms, callback=None, *args):
+        self.calls += 1
+        return f"after#{self.calls}"
+
+
+WIDGET_CLASSES = ("Frame", "Label", "Button", "Canvas", "Text", "Scale", "Checkbutton", "Scrollbar", "PhotoImage", "BooleanVar")
+
+
+@contextlib.contextmanager
+def headless_tk():
+    # Swap the tkinter widget classes for recorders while a GUI is being built
+    saved = {name: getattr(tk, name) for name in WIDGET_CLASSES}
+    saved_showinfo = messagebox.showinfo
+    try:
+        for name in WIDGET_CLASSES:
+            setattr(tk, name, RecordingWidget)
+        messagebox.showinfo = lambda *args, **kwargs: None
+        yield
+    finally:
+        for name, widget_class in saved.items():
+            setattr(tk, name, widget_class)
+        messagebox.showinfo = saved_showinfo
+
+
+# --- Benchmarks ---
+# Each benchmark takes (rounds, batch, seed) and returns one per-op latency in
+# ns per round, averaged over `batch` calls.
+
+def _time_batches(op, rounds, batch, before_batch=None):
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(rounds):
+        if before_batch is not None:
+            before_batch()
+        started = clock()
+        for _ in range(batch):
+            op()
+        samples.append((clock() - started) / batch)
+    return samples
+
+
+def random_game(rng, log_size=0):
+    game = LudoGame(SeededDice(rng.getrandbits(63)), log_size=log_size)
+    for player in game.players:
+        choices = [0, 100] + list(range(START_POSITIONS[player.color], 58))
+        for piece_idx in range(4):
+            player.pieces[piece_idx] = rng.choice(choices)
+        player.finished_pieces = sum(position == 100 for position in player.pieces)
+    game._index_board()
+    return game
+
+
+def midgame(seed, turns=150, log_size=None):
+    game = LudoGame(SeededDice(seed), log_size=log_size)
+    policies = [RandomPolicy(seed)] * 4
+    for _ in range(turns):
+        play_turn(game, policies)
+        if game.is_game_over():
+            break
+    return game
+
+
+def bench_roll_dice(rounds, batch, seed):
+    game = LudoGame(SeededDice(seed), log_size=0)
+    return _time_batches(game.roll_dice, rounds, batch)
+
+
+def bench_roll_dice_batched(rounds, batch, seed):
+    game = LudoGame(BatchedDice(seed), log_size=0)
+    return _time_batches(game.roll_dice, rounds, batch)
+
+
+def bench_move_piece(rounds, batch, seed):
+    rng = random.Random(seed)
+    moves = []
+
+    def prepare():
+        moves.clear()
+        for _ in range(batch):
+            game = random_game(rng)
+            moves.append((game, game.players[rng.randrange(4)], rng.randrange(4), rng.randint(1, 6)))
+        moves.reverse()
+
+    def op():
+        game, player, piece_idx, roll = moves.pop()
+        game.move_piece(player, piece_idx, roll)
+    return _time_batches(op, rounds, batch, prepare)
+
+
+def bench_get_movable_pieces(rounds, batch, seed):
+    rng = random.Random(seed)
+    game = random_game(rng)
+    player = game.players[0]
+    return _time_batches(lambda: game.get_movable_pieces(player, 6), rounds, batch)
+
+
+def bench_game_state(rounds, batch, seed):
+    game = midgame(seed)
+    return _time_batches(game.game_state, rounds, batch)
+
+
+def bench_full_game(rounds, batch, seed):
+    # The same games every round: dice and policy are re-seeded before each batch
+    dice = SeededDice(seed)
+    policy = RandomPolicy(seed)
+    policies = [policy] * 4
+
+    def prepare():
+        nonlocal dice
+        dice = SeededDice(seed)
+        policy.rng.seed(seed)
+    return _time_batches(lambda: play_game(policies, dice), rounds, batch, prepare)
+
+
+def _gui_bench(method_name, rounds, seed, advance=True, uncached=False):
+    policies = [RandomPolicy(seed)] * 4
+
+    def prepare():
+        if uncached: # Time the real rasterize, not the image caches
+            rasterize_rectangles.cache_clear()
+            gui._board_images.clear()
+        if advance:
+            if gui.game.is_game_over():
+                gui.reset_game()
+                gui.game.dice = SeededDice(seed)
+            play_turn(gui.game, policies)
+
+    with headless_tk(): # Also silences the game-over message box
+        gui = LudoGUI(RecordingMaster())
+        gui.game.dice = SeededDice(seed)
+        return _time_batches(getattr(gui, method_name), rounds, 1, prepare)
+
+
+def bench_update_gui(rounds, batch, seed):
+    return _gui_bench("update_gui", rounds, seed)
+
+
+def bench_render_board(rounds, batch, seed):
+    return _gui_bench("render_board", rounds, seed)
+
+
+def bench_draw_static_board(rounds, batch, seed):
+    return _gui_bench("_draw_static_board", rounds, seed, advance=False, uncached=True)
+
+
+# name -> (function, rounds, batch)
+BENCHMARKS = {
+    "engine.roll_dice": (bench_roll_dice, 200, 1000),
+    "engine.roll_dice_batched": (bench_roll_dice_batched, 200, 1000),
+    "engine.move_piece": (bench_move_piece, 200, 200),
+    "engine.get_movable_pieces": (bench_get_movable_pieces, 200, 1000),
+    "engine.game_state": (bench_game_state, 200, 100),
+    "engine.full_game": (bench_full_game, 50, 2),
+    "gui.update_gui": (bench_update_gui, 2000, 1),
+    "gui.render_board": (bench_render_board, 2000, 1),
+    "gui._draw_static_board": (bench_draw_static_board, 100, 1),
+}
+
+
+def summarize(samples, batch):
+    ordered = sorted(samples)
+    mean_ns = sum(ordered) / len(ordered)
+    return {
+        "ops_per_sec": 1e9 / mean_ns if mean_ns else None,
+        "mean_ns": mean_ns,
+        "p50_ns": percentile(ordered, 50),
+        "p90_ns": percentile(ordered, 90),
+        "p99_ns": percentile(ordered, 99),
+        "rounds": len(ordered),
+        "batch": batch,
+    }
+
+
+def run(names=None, seed=0, scale=1.0, progress=None):
+    results = {}
+    for name, (function, rounds, batch) in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        rounds = max(5, int(rounds * scale))
+        results[name] = summarize(function(rounds, batch, seed), batch)
+        if progress:
+            progress(name, results[name])
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": seed,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    # Returns (name, metric, old, new, ratio, regressed) rows for benchmarks in both runs
+    rows = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric in ("p50_ns", "mean_ns"):
+            ratio = new[metric] / old[metric] if old[metric] else float("inf")
+            rows.append((name, metric, old[metric], new[metric], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def format_result(name, result):
+    return (f"{name:28} {result['ops_per_sec']:>14,.0f} ops/s   p50 {result['p50_ns'] / 1000:9.2f} us   "
+            f"p90 {result['p90_ns'] / 1000:9.2f} us   p99 {result['p99_ns'] / 1000:9.2f} us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Ludo engine and GUI hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and write JSON results")
+    run_parser.add_argument("-o", "--output", help="JSON file to write (default: stdout summary only)")
+    run_parser.add_argument("-k", "--filter", action="append", help="Only run benchmarks whose name contains this")
+    run_parser.add_argument("-s", "--seed", type=int, default=0)
+    run_parser.add_argument("--scale", type=float, default=1.0, help="Multiply the number of rounds")
+
+    compare_parser = commands.add_parser("compare", help="Flag slowdowns between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("-t", "--threshold", type=float, default=THRESHOLD,
+                                help="Relative slowdown that counts as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.filter, args.seed, args.scale, progress=lambda name, result: print(format_result(name, result)))
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = 0
+    for name, metric, old, new, ratio, regressed in compare(baseline, current, args.threshold):
+        flag = "SLOWER" if regressed else ""
+        regressions += regressed
+        print(f"{name:28} {metric:7} {old / 1000:9.2f} us -> {new / 1000:9.2f} us  {ratio:6.2f}x  {flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
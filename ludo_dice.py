@@ -0,0 +1,104 @@
+import random
+import secrets
+
+
+BLOCK_SIZE = 1024 # Rolls pregenerated per refill of a BatchedDice
+
+# Maps a random byte to a roll; bytes 252-255 are dropped so every face stays equally likely
+_BYTE_TO_ROLL = bytes(byte % 6 + 1 for byte in range(256))
+_UNEVEN_BYTES = bytes(range(252, 256))
+
+
+def new_seed():
+    return secrets.randbits(63)
+
+
+# A dice source is any object with roll() -> 1..6 and a seed attribute (None
+# when the rolls don't come from a seed). LudoGame draws every roll from one.
+
+class SeededDice:
+    # One PRNG per game; the same seed replays the same rolls. drawn counts the
+    # rolls so far, so (seed, drawn) is enough to recreate the dice mid-game.
+    __slots__ = ("seed", "rng", "drawn")
+
+    def __init__(self, seed=None, drawn=0):
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.drawn = 0
+        for _ in range(drawn):
+            self.roll()
+
+    def roll(self):
+        self.drawn += 1
+        return self.rng.randint(1, 6)
+
+    def __repr__(self):
+        return f"SeededDice(seed={self.seed})"
+
+
+class BatchedDice:
+    # Seeded like SeededDice, but rolls are pregenerated block_size at a time,
+    # so a roll is the next byte of a block instead of a randint() call. The roll sequence
+    # differs from SeededDice with the same seed.
+    __slots__ = ("seed", "block_size", "numpy", "_source", "_rolls")
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE, numpy=False):
+        self.seed = new_seed() if seed is None else seed
+        self.block_size = block_size
+        self.numpy = numpy
+        if numpy:
+            import numpy as np
+            self._source = np.random.default_rng(self.seed)
+        else:
+            self._source = random.Random(self.seed)
+        self._rolls = iter(())
+
+    def _refill(self):
+        if self.numpy:
+            block = self._source.integers(1, 7, size=self.block_size, dtype="uint8").tobytes()
+        else:
+            # About 1.6% of bytes are rejected, so ask for a little more than a block
+            block = self._source.randbytes(self.block_size + self.block_size // 32 + 8).translate(_BYTE_TO_ROLL, _UNEVEN_BYTES)
+        self._rolls = iter(block)
+
+    def roll(self):
+        roll = next(self._rolls, 0)
+        if not roll:
+            self._refill()
+            roll = next(self._rolls)
+        return roll
+
+    def __repr__(self):
+        return f"BatchedDice(seed={self.seed}, block_size={self.block_size}, numpy={self.numpy})"
+
+
+class ScriptedDice:
+    # Plays back a fixed sequence of rolls, for replays and tests
+    __slots__ = ("seed", "rolls")
+
+    def __init__(self, rolls, seed=None):
+        self.seed = seed
+        self.rolls = iter(rolls)
+
+    def roll(self):
+        roll = next(self.rolls, None)
+        if roll is None:
+            raise RuntimeError("ScriptedDice ran out of rolls")
+        return roll
+
+    def __repr__(self):
+        return f"ScriptedDice(seed={self.seed})"
+
+
+# name -> factory(seed=None); the choices offered by --dice options
+DICE = {
+    "seeded": SeededDice,
+    "batched": BatchedDice,
+    "numpy": lambda seed=None: BatchedDice(seed, numpy=True),
+}
+
+
+def make_dice(name, seed=None):
+    if name not in DICE:
+        raise ValueError(f"Unknown dice source {name!r}, expected one of: {', '.join(sorted(DICE))}")
+    return DICE[name](seed)
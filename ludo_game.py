@@ -0,0 +1,364 @@
+from ludo_dice import SeededDice
+from ludo_rules import (
+    BEYOND_HOME, BOARD_SIZE, ENTER, FINISH, FINISHED_POSITION, HOME_STRETCH_POSITIONS, LEGAL_MOVES, MASK_PIECES, MOVE,
+    MOVE_TABLE, NEEDS_SIX, OPPONENT_MASKS, PLAYER_SEATS, START_POSITIONS, STRETCH,
+)
+from ludo_log import (
+    EV_BEYOND_HOME, EV_CAPTURED, EV_ENTERED, EV_FINISHED, EV_LOST_TURN, EV_MOVED, EV_NEEDS_SIX, EV_ROLLED, EV_STRETCH,
+    EV_WON, LOG_SIZE, GameLog,
+)
+from ludo_state import CURRENT, FINISHED, GAME_OVER, LAST_ROLL, PIECES, SIXES, STATE_SIZE, GameState, StateHistory
+
+
+class Player:
+    # A view of one seat inside a GameState; all mutable data lives in the state
+    __slots__ = ("name", "color", "seat", "state", "pieces")
+
+    def __init__(self, name, color, state=None, seat=0):
+        self.name = name
+        self.color = color
+        self.seat = seat
+        self.state = state if state is not None else GameState()
+        self.pieces = memoryview(self.state.data)[PIECES + seat * 4:PIECES + seat * 4 + 4] # 0: in base, 1-52: on board, 53-58: home stretch, 100: finished
+
+    @property
+    def six_rolls_in_a_row(self):
+        return self.state.data[SIXES + self.seat]
+
+    @six_rolls_in_a_row.setter
+    def six_rolls_in_a_row(self, value):
+        self.state.data[SIXES + self.seat] = value
+
+    @property
+    def finished_pieces(self):
+        return self.state.data[FINISHED + self.seat]
+
+    @finished_pieces.setter
+    def finished_pieces(self, value):
+        self.state.data[FINISHED + self.seat] = value
+
+    def all_pieces_home(self):
+        return all(postion == 0 for postion in self.pieces)
+
+    def all_pieces_finished(self):
+        return self.finished_pieces == 4
+
+
+class LudoGame:
+    __slots__ = ("dice", "state", "players", "log", "history", "_occupancy")
+
+    board_size = BOARD_SIZE
+    start_positions = START_POSITIONS
+    home_stretch_positions = HOME_STRETCH_POSITIONS
+
+    def __init__(self, dice=None, state=None, log_size=LOG_SIZE):
+        self.dice = dice if dice is not None else SeededDice() # Dice source from ludo_dice; a fresh seed by default
+        self.state = state if state is not None else GameState()
+        self.players = [Player(name, color, self.state, seat) for seat, (name, color) in enumerate(PLAYER_SEATS)]
+        self.log = GameLog(log_size) # log_size=0 turns logging off, None keeps everything
+        self.history = None # StateHistory, created the first time a version is asked for
+        self._index_board()
+
+    def _index_board(self):
+        # position -> bitmask of piece slots (seat * 4 + piece) standing there
+        self._occupancy = occupancy = [0] * (FINISHED_POSITION + 1)
+        for slot, position in enumerate(self.state.data[PIECES:PIECES + 16]):
+            occupancy[position] |= 1 << slot
+
+    def occupants(self, position):
+        mask = self._occupancy[position]
+        return [(slot // 4, slot % 4) for slot in range(16) if mask >> slot & 1]
+
+    @property
+    def current_player_idx(self):
+        return self.state.data[CURRENT]
+
+    @current_player_idx.setter
+    def current_player_idx(self, value):
+        self.state.data[CURRENT] = value
+
+    @property
+    def last_roll(self):
+        return self.state.data[LAST_ROLL] or None
+
+    @last_roll.setter
+    def last_roll(self, value):
+        self.state.data[LAST_ROLL] = value or 0
+
+    @property
+    def game_over(self):
+        return bool(self.state.data[GAME_OVER])
+
+    @game_over.setter
+    def game_over(self, value):
+        self.state.data[GAME_OVER] = value
+
+    @property
+    def game_log(self):
+        # Rendered text of the buffered events
+        return self.log.text()
+
+    @property
+    def seed(self):
+        # Seed of the dice, enough to replay the game with the same choices; None for scripted dice
+        return self.dice.seed
+
+    @property
+    def version(self):
+        # Grows whenever the state or log changed since it was last read
+        history = self.history
+        if history is None:
+            history = self.history = StateHistory()
+        return history.observe(self.state.data, self.log.seq)
+
+    def clone(self, dice=None, log_size=0):
+        # Copies the position only; by default the clone does not log and shares the dice
+        return LudoGame(dice if dice is not None else self.dice, self.state.clone(), log_size)
+
+    def roll_dice(self):
+        return self.apply_roll(self.dice.roll())
+
+    def apply_roll(self, roll):
+        # roll_dice with a known roll, for search and replays
+        player = self.players[self.current_player_idx]
+        log = self.log
+        if log.enabled:
+            log.add(EV_ROLLED, player.seat, roll=roll)
+
+        if roll == 6:
+            player.six_rolls_in_a_row += 1
+            if player.six_rolls_in_a_row == 3:
+                if log.enabled:
+                    log.add(EV_LOST_TURN, player.seat, roll=roll)
+                player.six_rolls_in_a_row = 0
+                self.last_roll = None # Player loses turn, no move can be made
+                self.next_player()
+                return {"roll": roll, "lost_turn": True}
+        else:
+            player.six_rolls_in_a_row = 0
+
+        self.last_roll = roll
+        return {"roll": roll, "lost_turn": False}
+
+    def move_piece(self, player, piece_idx, steps):
+        seat = player.seat
+        current_position = player.pieces[piece_idx]
+        outcome, new_position = MOVE_TABLE[seat][current_position][steps]
+        log = self.log if self.log.enabled else None
+
+        if outcome == NEEDS_SIX:
+            if log:
+                log.add(EV_NEEDS_SIX, seat, piece_idx, current_position, current_position, steps)
+            return {"moved": False, "next_player": True}
+        if outcome == BEYOND_HOME:
+            if log:
+                log.add(EV_BEYOND_HOME, seat, piece_idx, current_position, current_position, steps)
+            return {"moved": False, "next_player": steps != 6}
+
+        occupancy = self._occupancy
+        slot_bit = 1 << (seat * 4 + piece_idx)
+        occupancy[current_position] &= ~slot_bit
+        occupancy[new_position] |= slot_bit
+        player.pieces[piece_idx] = new_position
+
+        if outcome == ENTER:
+            if log:
+                log.add(EV_ENTERED, seat, piece_idx, current_position, new_position, steps)
+            return {"moved": True, "next_player": False}  # Extra roll for 6
+
+        if outcome == FINISH:
+            player.finished_pieces += 1
+            if log:
+                log.add(EV_FINISHED, seat, piece_idx, current_position, new_position, steps)
+            if player.finished_pieces == 4:
+                self.game_over = True
+                if log:
+                    log.add(EV_WON, seat, piece_idx, current_position, new_position, steps)
+            return {"moved": True, "finished": True, "next_player": steps != 6}
+
+        if outcome == STRETCH:
+            if log:
+                log.add(EV_STRETCH, seat, piece_idx, current_position, new_position, steps)
+            return {"moved": True, "next_player": steps != 6}
+
+        if log:
+            log.add(EV_MOVED, seat, piece_idx, current_position, new_position, steps)
+
+        # Landing on opponents sends them back to base, except on the mover's start square
+        captured = occupancy[new_position] & OPPONENT_MASKS[seat] if outcome == MOVE else 0
+        if captured:
+            occupancy[new_position] ^= captured
+            occupancy[0] |= captured
+            data = self.state.data
+            while captured:
+                low_bit = captured & -captured
+                captured ^= low_bit
+                slot = low_bit.bit_length() - 1
+                data[PIECES + slot] = 0
+                if log:
+                    log.add(EV_CAPTURED, seat, piece_idx, slot // 4, slot % 4, steps)
+
+        return {"moved": True, "next_player": steps != 6}
+
+    def next_player(self):
+        self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
+
+    def is_game_over(self):
+        return self.game_over
+
+    def game_state(self):
+        return {
+            "players": [
+                {
+                    "name": p.name,
+                    "color": p.color,
+                    "pieces": list(p.pieces),
+                    "sixRollsInARow": p.six_rolls_in_a_row,
+                    "finishedPieces": p.finished_pieces,
+                } for p in self.players
+            ],
+            "currentPlayerIndex": self.current_player_idx,
+            "lastRoll": self.last_roll,
+            "gameOver": self.is_game_over(),
+            "gameLog": self.log.text(),
+            "startPositions": dict(self.start_positions),
+            "version": self.version,
+        }
+
+    def changes_since(self, version):
+        # Only what differs from an earlier version; a full game_state() (with
+        # "full": True) when that version or its log events are no longer kept
+        current = self.version
+        previous = self.history.find(version)
+        if previous is None or previous[1] < self.log.first_seq():
+            state = self.game_state()
+            state["full"] = True
+            return state
+
+        old, log_seq = previous
+        data = self.state.data
+        changes = {"version": current, "full": False}
+        if version == current:
+            return changes
+        pieces = [[slot // 4, slot % 4, data[PIECES + slot]] for slot in range(16) if data[PIECES + slot] != old[PIECES + slot]]
+        if pieces:
+            changes["pieces"] = pieces
+        players = [
+            {"index": seat, "sixRollsInARow": data[SIXES + seat], "finishedPieces": data[FINISHED + seat]}
+            for seat in range(4)
+            if data[SIXES + seat] != old[SIXES + seat] or data[FINISHED + seat] != old[FINISHED + seat]
+        ]
+        if players:
+            changes["players"] = players
+        if data[CURRENT] != old[CURRENT]:
+            changes["currentPlayerIndex"] = data[CURRENT]
+        if data[LAST_ROLL] != old[LAST_ROLL]:
+            changes["lastRoll"] = data[LAST_ROLL] or None
+        if data[GAME_OVER] != old[GAME_OVER]:
+            changes["gameOver"] = bool(data[GAME_OVER])
+        if self.log.seq != log_seq:
+            changes["gameLog"] = self.log.since_text(log_seq)
+        return changes
+
+    def legal_mask(self, roll=None, seat=None):
+        # Bit i set when piece i of seat (default: the player to move) can move
+        # with roll (default: the pending roll); exactly the moves move_piece makes
+        data = self.state.data
+        if seat is None:
+            seat = data[CURRENT]
+        legal = LEGAL_MOVES[seat][roll or data[LAST_ROLL]]
+        base = PIECES + seat * 4
+        return legal[data[base]] | legal[data[base + 1]] << 1 | legal[data[base + 2]] << 2 | legal[data[base + 3]] << 3
+
+    def legal_moves(self, roll=None, seat=None):
+        # Tuple of movable piece indices, see legal_mask()
+        return MASK_PIECES[self.legal_mask(roll, seat)]
+
+    def get_movable_pieces(self, player, roll):
+        return MASK_PIECES[self.legal_mask(roll, player.seat)]
+
+    def make_move(self, piece_idx, roll=None):
+        # Plays piece_idx for the player to move the way the turn flow does
+        # (move, pass the turn unless it earned another roll, clear the roll),
+        # in place and without logging. Returns the undo record for unmake_move().
+        data = self.state.data
+        seat = data[CURRENT]
+        roll = roll or data[LAST_ROLL]
+        slot = seat * 4 + piece_idx
+        src = data[PIECES + slot]
+        outcome, dst = MOVE_TABLE[seat][src][roll]
+        undo_header = bytes(data[CURRENT:STATE_SIZE])
+        captured = 0
+
+        if outcome == NEEDS_SIX or outcome == BEYOND_HOME:
+            dst = src
+            advance = outcome == NEEDS_SIX or roll != 6
+        else:
+            occupancy = self._occupancy
+            slot_bit = 1 << slot
+            occupancy[src] &= ~slot_bit
+            occupancy[dst] |= slot_bit
+            data[PIECES + slot] = dst
+            advance = outcome != ENTER and roll != 6
+            if outcome == FINISH:
+                data[FINISHED + seat] += 1
+                if data[FINISHED + seat] == 4:
+                    data[GAME_OVER] = 1
+            elif outcome == MOVE:
+                captured = occupancy[dst] & OPPONENT_MASKS[seat]
+                if captured:
+                    occupancy[dst] ^= captured
+                    occupancy[0] |= captured
+                    remaining = captured
+                    while remaining:
+                        low_bit = remaining & -remaining
+                        remaining ^= low_bit
+                        data[PIECES + low_bit.bit_length() - 1] = 0
+
+        if advance:
+            data[CURRENT] = (seat + 1) % 4
+        data[LAST_ROLL] = 0
+        return (undo_header, slot, src, dst, captured)
+
+    def make_roll(self, roll):
+        # apply_roll in place and without logging; last_roll is None afterwards
+        # when the roll forfeited the turn. Returns an undo record for unmake_move().
+        data = self.state.data
+        undo = (bytes(data[CURRENT:STATE_SIZE]), 0, 0, 0, 0)
+        seat = data[CURRENT]
+        if roll == 6:
+            if data[SIXES + seat] == 2:
+                data[SIXES + seat] = 0
+                data[LAST_ROLL] = 0
+                data[CURRENT] = (seat + 1) % 4
+                return undo
+            data[SIXES + seat] += 1
+        else:
+            data[SIXES + seat] = 0
+        data[LAST_ROLL] = roll
+        return undo
+
+    def unmake_move(self, undo):
+        # Reverts make_move() or make_roll(); records must be undone newest first
+        header, slot, src, dst, captured = undo
+        data = self.state.data
+        data[CURRENT:STATE_SIZE] = header
+        if src == dst:
+            return
+        occupancy = self._occupancy
+        slot_bit = 1 << slot
+        occupancy[dst] &= ~slot_bit
+        occupancy[src] |= slot_bit
+        data[PIECES + slot] = src
+        if captured:
+            occupancy[0] &= ~captured
+            occupancy[dst] |= captured
+            while captured:
+                low_bit = captured & -captured
+                captured ^= low_bit
+                data[PIECES + low_bit.bit_length() - 1] = dst
+
+    def load_state(self, data):
+        # Overwrites the position in place; players keep their views of it
+        self.state.data[:] = data
+        self._index_board()
@@ -1,187 +1,93 @@
-import random
+import argparse
+import functools
 import tkinter as tk
 from tkinter import messagebox
 
-
-class Player:
-    def __init__(self, name, color):
-        self.name = name
-        self.color = color
-        self.pieces = [0, 0, 0, 0] # 0: in base, 1-52: on board, 53-58: home stretch, 100: finished
-        self.six_rolls_in_a_row = 0
-        self.blocked_pieces = []
-        self.finished_pieces = 0
-
-    def all_pieces_home(self):
-        return all(postion == 0 for postion in self.pieces)
-
-    def all_pieces_finished(self):
-        return self.finished_pieces == 4
-
-
-class LudoGame:
-    def __init__(self):
-        self.board_size = 52
-        self.start_positions = {
-            "Red": 1,
-            "Green": 14,
-            "Yellow": 27,
-            "Blue": 40
-        }
-        self.home_stretch_positions = {
-            "Red": [52, 53, 54, 55, 56, 57], # Positions before entering home
-            "Green": [13, 12, 11, 10, 9, 8], # These will need to be mapped to global board positions
-            "Yellow": [26, 25, 24, 23, 22, 21],
-            "Blue": [39, 38, 37, 36, 35, 34]
-        }
-        self.players = [
-            Player("Player 1", "Red"),
-            Player("Player 2", "Green"),
-            Player("Player 3", "Blue"),
-            Player("Player 4", "Yellow"),
-        ]
-        self.current_player_idx = 0
-        self.last_roll = None
-        self.six_rolls_count = 0
-        self.game_log = []
-        self.game_over = False
-
-    def roll_dice(self):
-        player = self.players[self.current_player_idx]
-        roll = random.randint(1, 6)
-        self.game_log.append(f"{player.name} rolled a {roll}")
-
-        if roll == 6:
-            player.six_rolls_in_a_row += 1
-            if player.six_rolls_in_a_row == 3:
-                self.game_log.append(f"{player.name} rolled three 6s in a row and loses their turn.")
-                player.six_rolls_in_a_row = 0
-                self.last_roll = None # Player loses turn, no move can be made
-                self.next_player()
-                return {"roll": roll, "lost_turn": True}
-        else:
-            player.six_rolls_in_a_row = 0
-
-        self.last_roll = roll
-        return {"roll": roll, "lost_turn": False}
-
-    def move_piece(self, player, piece_idx, steps):
-        current_position = player.pieces[piece_idx]
-        player_color = player.color
-        start_pos = self.start_positions[player_color]
-        home_stretch = self.home_stretch_positions[player_color]
-
-        # Case 1: Piece is in the base
-        if current_position == 0:
-            if steps == 6:
-                player.pieces[piece_idx] = start_pos
-                self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved out of base to start position.")
-                return {"moved": True, "next_player": False}  # Extra roll for 6
-            else:
-                self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} needs a 6 to move out of base.")
-                return {"moved": False, "next_player": True}
-
-        board_path = list(range(1, self.board_size + 1))
-        
-        # Determine effective current position for movement
-        effective_current_position = current_position
-        
-        # Calculate new potential position
-        new_position = effective_current_position + steps
-
-        # Check if entering home stretch
-        if effective_current_position <= self.board_size and new_position > self.board_size:
-            if new_position > (self.board_size + 6): # Beyond the home stretch
-                self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} cannot move beyond home with {steps}.")
-                return {"moved": False, "next_player": steps != 6}
-            
-            player.pieces[piece_idx] = new_position
-            if new_position == (self.board_size + 6): # Reached home column
-                player.finished_pieces += 1
-                player.pieces[piece_idx] = 100 # Mark as finished
-                self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} reached home!")
-                if player.finished_pieces == 4:
-                    self.game_over = True
-                    self.game_log.append(f"Game Over! {player.name} wins!")
-                return {"moved": True, "finished": True, "next_player": steps != 6}
-            
-            self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved to {new_position} (home stretch).")
-            return {"moved": True, "next_player": steps != 6}
-
-        # Check for movement on the main board
-        if new_position <= self.board_size:
-            player.pieces[piece_idx] = new_position
-            self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} moved to {new_position}.")
-
-            # Check for landing on opponent's pawn
-            for opponent in self.players:
-                if opponent.color != player_color:
-                    for opp_piece_idx, opp_pos in enumerate(opponent.pieces):
-                        if opp_pos == new_position and new_position != start_pos: # Cannot send back at start
-                            opponent.pieces[opp_piece_idx] = 0 # Send back to base
-                            self.game_log.append(f"{player.name}'s {player_color} piece {opp_piece_idx+1} landed on {opponent.name}'s {opponent.color} piece {opp_piece_idx+1}, sending it back to base!")
-            
-            return {"moved": True, "next_player": steps != 6}
-        
-        # If the new position is beyond the main board but not yet in the home stretch (or an invalid move)
-        self.game_log.append(f"{player.name}'s {player_color} piece {piece_idx+1} cannot move to {new_position}.")
-        return {"moved": False, "next_player": steps != 6} # If not moved, next player always turns
-
-    def next_player(self):
-        self.current_player_idx = (self.current_player_idx + 1) % len(self.players)
-
-    def is_game_over(self):
-        return self.game_over
-
-    def game_state(self):
-        return {
-            "players": [
-                {
-                    "name": p.name,
-                    "color": p.color,
-                    "pieces": p.pieces,
-                    "sixRollsInARow": p.six_rolls_in_a_row,
-                    "finishedPieces": p.finished_pieces,
-                } for p in self.players
-            ],
-            "currentPlayerIndex": self.current_player_idx,
-            "lastRoll": self.last_roll,
-            "gameOver": self.is_game_over(),
-            "gameLog": self.game_log,
-            "startPositions": self.start_positions
-        }
-
-    def get_movable_pieces(self, player, roll):
-        movable_indices = []
-        for i, position in enumerate(player.pieces):
-            if position == 0 and roll == 6:
-                movable_indices.append(i)
-            elif 0 < position < 100:
-                # This is a simplified check. A more robust Ludo game would involve
-                # checking if the move is valid based on the current board state,
-                # including opponent's pieces and home stretch.
-                # For now, we'll allow any piece on the board or home stretch to be movable
-                # if the roll is available.
-                movable_indices.append(i)
-        return movable_indices
+from ludo_dice import SeededDice
+from ludo_game import LudoGame, Player # noqa: F401 (Player re-exported; the engine used to live here)
+from ludo_worker import GuiWorker
+
+
+BOARD_BACKGROUND = "#111827"
+
+
+@functools.lru_cache(maxsize=8)
+def rasterize_rectangles(size, background, rectangles):
+    # Binary PPM of canvas-style rectangles (fill plus a 1px outline, dashed
+    # 2 on 2 off when asked), painted in order over the background
+    def rgb(color):
+        return bytes.fromhex(color[1:])
+
+    row_bytes = size * 3
+    pixels = bytearray(rgb(background) * (size * size))
+    for x1, y1, x2, y2, fill, outline, dashed in rectangles:
+        x1, y1 = max(0, round(x1)), max(0, round(y1))
+        x2, y2 = min(size - 1, round(x2)), min(size - 1, round(y2))
+        if x1 > x2 or y1 > y2:
+            continue
+        run = rgb(fill) * (x2 - x1 + 1)
+        for y in range(y1, y2 + 1):
+            offset = y * row_bytes + x1 * 3
+            pixels[offset:offset + len(run)] = run
+        line = rgb(outline)
+        for x in range(x1, x2 + 1):
+            if not dashed or (x - x1) % 4 < 2:
+                pixels[y1 * row_bytes + x * 3:y1 * row_bytes + x * 3 + 3] = line
+                pixels[y2 * row_bytes + x * 3:y2 * row_bytes + x * 3 + 3] = line
+        for y in range(y1, y2 + 1):
+            if not dashed or (y - y1) % 4 < 2:
+                pixels[y * row_bytes + x1 * 3:y * row_bytes + x1 * 3 + 3] = line
+                pixels[y * row_bytes + x2 * 3:y * row_bytes + x2 * 3 + 3] = line
+    return b"P6 %d %d 255\n" % (size, size) + bytes(pixels)
 
 
 class LudoGUI:
-    def __init__(self, master):
+    bot_delay_ms = 400
+    autoplay_restart_ms = 2000 # Pause on the final position before auto-play starts the next game
+
+    def __init__(self, master, bots=None, tablebase=None, autoplay_policy=None, seed=None):
         self.master = master
         master.title("Ludo Game")
-        self.game = LudoGame()
+        self.game = LudoGame(SeededDice(seed))
+        self.bots = dict(bots or {}) # seat -> policy(game, movable) playing that seat
+        self.autoplay_policy = autoplay_policy # Plays every seat without a bot while auto-play is on
+        self.autoplay = False
+        self.worker = GuiWorker(master) # Bot searches run here so the window stays responsive
+        self._bot_after = None
+        self._bot_job = None # Future of the bot search in flight
+        self._bot_acting = False
+        self._autoplay_wins = [0] * len(self.game.players)
+        self.tablebase = tablebase # ludo_tablebase.Tablebase for the win chance readout, optional
+        self._win_chance_text = None
 
         self.player_colors_map = {"Red": "#ef4444", "Green": "#22c55e", "Yellow": "#f59e0b", "Blue": "#3b82f6"}
         self.base_colors_map = {"Red": "#7f1d1d", "Green": "#064e3b", "Yellow": "#7c4a03", "Blue": "#0b3579"}
         self.cell_labels = {}  # To store references to labels for pieces
-        self.piece_widgets = {} # Store piece IDs on canvas
+        self.piece_widgets = {} # (player_idx, piece_idx) -> (oval id, text id), created once
+        self._piece_cells = {} # (player_idx, piece_idx) -> (row, col) last drawn, None when hidden
+        self._highlighted = set() # Piece keys currently drawn as movable
+        self._label_state = [None] * len(self.game.players)
+        self._dice_text = None
+        self._log_shown = 0 # game.log sequence number already shown in log_text
+        self._version = -1 # game.version already drawn; -1 forces a full redraw
+        self._board_images = {} # (size, rectangles) -> PhotoImage of the static board
+        self._board_item = None
+        self._board_image = None # The image on the canvas; Tk drops images Python no longer references
 
         self.board_size_px = 600
         self.cell_size_px = self.board_size_px / 15
+        self.path_coords = self._get_path_coordinates()
+        self.home_stretch_coords = self._get_home_stretch_coordinates()
+        self.base_start_cell_coords = {
+            "Red": [(1,1),(1,3),(3,1),(3,3)],
+            "Green": [(1,10),(1,12),(3,10),(3,12)],
+            "Yellow": [(10,1),(10,3),(12,1),(12,3)],
+            "Blue": [(10,10),(10,12),(12,10),(12,12)]
+        }
 
         # --- GUI Elements ---
         self.create_widgets()
+        self.log_message(f"Dice seed {self.game.seed}.") # Enough to replay this game with --seed
         self.update_gui()
 
     def create_widgets(self):
@@ -204,10 +110,16 @@ class LudoGUI:
             p_label.pack(side=tk.LEFT, padx=2)
             self.player_labels.append(p_label)
 
+        self.win_chance_label = None
+        if self.tablebase is not None:
+            self.win_chance_label = tk.Label(self.player_info_frame, text="Win chance: --", bg="#0f172a", fg="#94a3b8")
+            self.win_chance_label.pack(pady=5, padx=5, anchor="w")
+
         # Game Board Canvas
-        self.board_canvas = tk.Canvas(main_frame, width=self.board_size_px, height=self.board_size_px, bg="#111827", bd=2, relief="groove")
+        self.board_canvas = tk.Canvas(main_frame, width=self.board_size_px, height=self.board_size_px, bg=BOARD_BACKGROUND, bd=2, relief="groove")
         self.board_canvas.pack(side=tk.LEFT, padx=10, pady=10)
         self._draw_static_board()
+        self._create_pieces()
 
         # Control and Log Frame
         right_frame = tk.Frame(main_frame, bg="#0b1220")
@@ -225,6 +137,14 @@ class LudoGUI:
         self.reset_button = tk.Button(control_frame, text="Reset Game", command=self.reset_game, bg="#111827", fg="white", activebackground="#1f2937", activeforeground="white")
         self.reset_button.pack(side=tk.LEFT, padx=5, pady=5)
 
+        self.autoplay_var = tk.BooleanVar(master=self.master, value=False)
+        self.autoplay_check = tk.Checkbutton(control_frame, text="Auto-play", variable=self.autoplay_var, command=self.toggle_autoplay, bg="#0f172a", fg="white", selectcolor="#111827", activebackground="#0f172a", activeforeground="white")
+        self.autoplay_check.pack(side=tk.LEFT, padx=5, pady=5)
+
+        self.speed_scale = tk.Scale(control_frame, label="Delay (ms)", from_=0, to=1000, resolution=25, orient=tk.HORIZONTAL, command=self.set_bot_delay, bg="#0f172a", fg="white", highlightthickness=0, length=120)
+        self.speed_scale.set(self.bot_delay_ms)
+        self.speed_scale.pack(side=tk.LEFT, padx=5, pady=5)
+
         # Game Log
         self.log_frame = tk.Frame(right_frame, bg="#0f172a", bd=2, relief="groove")
         self.log_frame.pack(pady=10, fill=tk.BOTH, expand=True)
@@ -235,13 +155,16 @@ class LudoGUI:
         self.log_text = tk.Text(self.log_frame, height=15, width=40, state="disabled", bg="#111827", fg="#94a3b8", bd=0, highlightthickness=0)
         self.log_text.pack(side=tk.BOTTOM, fill=tk.BOTH, expand=True)
 
-    def _draw_static_board(self):
+    def _static_board_rectangles(self):
+        # (x1, y1, x2, y2, fill, outline, dashed) for every board cell, in drawing order
+        rectangles = []
+
         # Draw grid cells
         for r in range(15):
             for c in range(15):
                 x1, y1 = c * self.cell_size_px, r * self.cell_size_px
                 x2, y2 = x1 + self.cell_size_px, y1 + self.cell_size_px
-                self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="#111827", outline="#1f2937", width=1)
+                rectangles.append((x1, y1, x2, y2, "#111827", "#1f2937", False))
         
         # Draw home bases
         home_base_coords = {
@@ -255,7 +178,7 @@ class LudoGUI:
             r2, c2 = end_rc
             x1, y1 = c1 * self.cell_size_px, r1 * self.cell_size_px
             x2, y2 = (c2 + 1) * self.cell_size_px, (r2 + 1) * self.cell_size_px
-            self.board_canvas.create_rectangle(x1, y1, x2, y2, fill=self.base_colors_map[color_name], outline="#1f2937", width=1)
+            rectangles.append((x1, y1, x2, y2, self.base_colors_map[color_name], "#1f2937", False))
         
         # Draw start cells within home bases
         start_cell_offsets = {
@@ -268,14 +191,14 @@ class LudoGUI:
             for r_offset, c_offset in offsets:
                 x1, y1 = c_offset * self.cell_size_px, r_offset * self.cell_size_px
                 x2, y2 = x1 + self.cell_size_px, y1 + self.cell_size_px
-                self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="#111827", outline="#1f2937", width=1)
+                rectangles.append((x1, y1, x2, y2, "#111827", "#1f2937", False))
 
         # Draw main path
         path_coords = self._get_path_coordinates()
         for r, c in path_coords:
             x1, y1 = c * self.cell_size_px, r * self.cell_size_px
             x2, y2 = x1 + self.cell_size_px, y1 + self.cell_size_px
-            self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="#0f172a", outline="#1f2937", width=1)
+            rectangles.append((x1, y1, x2, y2, "#0f172a", "#1f2937", False))
 
         # Draw home stretches
         home_stretch_coords = self._get_home_stretch_coordinates()
@@ -283,122 +206,257 @@ class LudoGUI:
             for r, c in coords:
                 x1, y1 = c * self.cell_size_px, r * self.cell_size_px
                 x2, y2 = x1 + self.cell_size_px, y1 + self.cell_size_px
-                self.board_canvas.create_rectangle(x1, y1, x2, y2, fill=self.player_colors_map[color_name], outline="#1f2937", width=1, dash=(2,2))
+                rectangles.append((x1, y1, x2, y2, self.player_colors_map[color_name], "#1f2937", True))
         
         # Draw center square
         center_start_r, center_start_c = 6, 6
         center_end_r, center_end_c = 8, 8
         x1, y1 = center_start_c * self.cell_size_px, center_start_r * self.cell_size_px
         x2, y2 = (center_end_c + 1) * self.cell_size_px, (center_end_r + 1) * self.cell_size_px
-        self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="#0f172a", outline="#1f2937", width=1)
+        rectangles.append((x1, y1, x2, y2, "#0f172a", "#1f2937", False))
+        return rectangles
 
+    def _draw_static_board(self):
+        # The board never changes: rasterize it once per size and colour scheme
+        # and show it as a single image item underneath the pieces
+        rectangles = tuple(self._static_board_rectangles())
+        key = (self.board_size_px, rectangles)
+        image = self._board_images.get(key)
+        if image is None:
+            ppm = rasterize_rectangles(self.board_size_px, BOARD_BACKGROUND, rectangles)
+            image = self._board_images[key] = tk.PhotoImage(master=self.master, data=ppm, format="PPM")
+        if self._board_item is None:
+            self._board_item = self.board_canvas.create_image(0, 0, image=image, anchor="nw")
+        else:
+            self.board_canvas.itemconfig(self._board_item, image=image)
+        self._board_image = image
 
 
     def log_message(self, message):
+        self._flush_game_log() # Keep GUI messages after the engine events that caused them
+        self._append_log(message)
+
+    def _flush_game_log(self):
+        # Append only the log events added since the last refresh
+        log = self.game.log
+        if log.seq != self._log_shown:
+            self._append_log("\n".join(log.since_text(self._log_shown)))
+            self._log_shown = log.seq
+
+    def _append_log(self, message):
         self.log_text.config(state="normal")
         self.log_text.insert(tk.END, message + "\n")
         self.log_text.see(tk.END) # Auto-scroll to the end
         self.log_text.config(state="disabled")
 
     def update_gui(self):
-        state = self.game.game_state()
-        self.dice_label.config(text=f"Dice: {state['lastRoll'] if state['lastRoll'] else '--'}")
-        
-        # Update player info
-        for i, player_data in enumerate(state['players']):
-            self.player_labels[i].config(text=f"{player_data['name']} ({player_data['color']}): {player_data['finishedPieces']} finished")
-            if i == state['currentPlayerIndex']:
-                self.player_labels[i].config(font=("Arial", 10, "bold"), fg="yellow") # Highlight current player
-            else:
-                self.player_labels[i].config(font=("Arial", 10, "normal"), fg="white")
-
-        # Update game log
-        self.log_text.config(state="normal")
-        self.log_text.delete(1.0, tk.END) # Clear existing log
-        for msg in state['gameLog']:
-            self.log_message(msg)
-        self.log_text.config(state="disabled")
-
-        self.render_board()
-
-        if state['gameOver']:
-            messagebox.showinfo("Game Over", f"{state['players'][state['currentPlayerIndex']]['name']} wins!")
+        game = self.game
+        changes = game.changes_since(self._version)
+        self._version = changes["version"]
+        full = changes["full"]
+
+        if full or "lastRoll" in changes:
+            dice_text = f"Dice: {game.last_roll if game.last_roll else '--'}"
+            if dice_text != self._dice_text:
+                self.dice_label.config(text=dice_text)
+                self._dice_text = dice_text
+
+        # Update player info, touching only labels whose text or highlight changed
+        if full or "players" in changes or "currentPlayerIndex" in changes:
+            for i, player in enumerate(game.players):
+                label_state = (player.finished_pieces, i == game.current_player_idx)
+                if label_state == self._label_state[i]:
+                    continue
+                self._label_state[i] = label_state
+                if label_state[1]:
+                    self.player_labels[i].config(text=f"{player.name} ({player.color}): {player.finished_pieces} finished", font=("Arial", 10, "bold"), fg="yellow") # Highlight current player
+                else:
+                    self.player_labels[i].config(text=f"{player.name} ({player.color}): {player.finished_pieces} finished", font=("Arial", 10, "normal"), fg="white")
+
+        self._flush_game_log()
+
+        if self.win_chance_label is not None and (full or len(changes) > 2):
+            self._update_win_chance()
+
+        if full:
+            self.render_board()
+        elif "pieces" in changes or "lastRoll" in changes or "currentPlayerIndex" in changes:
+            self.render_board(changes.get("pieces", ()))
+
+        if game.is_game_over():
             self.roll_button.config(state="disabled")
-
-    def render_board(self):
-        # Clear existing pieces on canvas
-        for piece_id in self.piece_widgets.values():
-            self.board_canvas.delete(piece_id)
-        self.piece_widgets.clear()
-
-        # Define simplified board coordinates for GUI
-        path_coords = self._get_path_coordinates()
-        home_stretch_coords = self._get_home_stretch_coordinates()
-        
-        base_start_cell_coords = {
-            "Red": [(1,1),(1,3),(3,1),(3,3)],
-            "Green": [(1,10),(1,12),(3,10),(3,12)],
-            "Yellow": [(10,1),(10,3),(12,1),(12,3)],
-            "Blue": [(10,10),(10,12),(12,10),(12,12)]
-        }
-
-        for player_idx, player_data in enumerate(self.game.players):
-            player_color_name = player_data.color
-            player_gui_color = self.player_colors_map[player_color_name]
-
-            for piece_idx, piece_position in enumerate(player_data.pieces):
-                r, c = -1, -1 # Invalid coordinates by default
-
-                if piece_position == 0:  # In base
-                    if player_color_name in base_start_cell_coords and piece_idx < len(base_start_cell_coords[player_color_name]):
-                        r, c = base_start_cell_coords[player_color_name][piece_idx]
-
-                elif 1 <= piece_position <= 52: # On main path
-                    if piece_position - 1 < len(path_coords):
-                        r, c = path_coords[piece_position - 1]
-
-                elif 53 <= piece_position < 100: # In home stretch
-                    stretch_index = piece_position - 53
-                    if player_color_name in home_stretch_coords and stretch_index < len(home_stretch_coords[player_color_name]):
-                        r, c = home_stretch_coords[player_color_name][stretch_index]
-                
-                # Draw piece on GUI if coordinates are valid
-                if r != -1 and c != -1:
-                    x_center = (c * self.cell_size_px) + (self.cell_size_px / 2)
-                    y_center = (r * self.cell_size_px) + (self.cell_size_px / 2)
-                    radius = self.cell_size_px / 3
-                    
-                    piece_id = self.board_canvas.create_oval(
-                        x_center - radius, y_center - radius,
-                        x_center + radius, y_center + radius,
-                        fill=player_gui_color, outline="white", width=1
-                    )
-                    self.board_canvas.create_text(x_center, y_center, text=str(piece_idx + 1), fill="white", font=("Arial", 10, "bold"), tags=piece_id) # Add piece number
-                    self.board_canvas.tag_bind(piece_id, "<Button-1>", lambda e, p_idx=player_idx, pc_idx=piece_idx: self.handle_piece_click(p_idx, pc_idx))
-                    self.board_canvas.tag_bind(f"text{piece_id}", "<Button-1>", lambda e, p_idx=player_idx, pc_idx=piece_idx: self.handle_piece_click(p_idx, pc_idx))
-                    self.piece_widgets[(player_idx, piece_idx)] = piece_id # Store reference
-                    
-        # Highlight current player's movable pieces
+            if self.autoplay:
+                self._autoplay_game_over()
+            else:
+                messagebox.showinfo("Game Over", f"{game.players[game.current_player_idx].name} wins!")
+        else:
+            self._schedule_bot()
+
+    def _update_win_chance(self):
+        # Exact duel odds for the player to move once the endgame is in the tablebase
+        from ludo_tablebase import duel_opponent
+
+        game = self.game
+        seat = game.current_player_idx
+        opponent = duel_opponent(game, seat, self.tablebase.max_pieces)
+        chance = self.tablebase.win_chance(game, seat, opponent) if opponent is not None else None
+        if chance is None:
+            text = "Win chance: --"
+        else:
+            text = f"Win chance: {game.players[seat].name} {chance:.0%} vs {game.players[opponent].name}"
+        if text != self._win_chance_text:
+            self.win_chance_label.config(text=text)
+            self._win_chance_text = text
+
+    def _bot_for(self, seat):
+        bot = self.bots.get(seat)
+        if bot is None and self.autoplay:
+            bot = self.autoplay_policy
+        return bot
+
+    def _schedule_bot(self):
+        if self._bot_after is None and self._bot_job is None and self._bot_for(self.game.current_player_idx) is not None:
+            self._bot_after = self.master.after(self.bot_delay_ms, self._play_bot_step)
+
+    def _play_bot_step(self):
+        # One bot action per call: roll, or start a search for the pending roll.
+        # The search runs on the worker against a snapshot; _apply_bot_move
+        # plays its answer, and the update_gui after either action schedules
+        # the next step.
+        self._bot_after = None
+        seat = self.game.current_player_idx
+        bot = self._bot_for(seat)
+        if bot is None or self.game.is_game_over():
+            return
+        if self.game.last_roll is None:
+            self._bot_acting = True
+            try:
+                self.roll_dice()
+            finally:
+                self._bot_acting = False
+            return
+        snapshot = self.game.clone(dice=SeededDice()) # Searches never draw from the real dice
+        self._bot_job = self.worker.submit(bot, snapshot, snapshot.legal_moves(),
+                                           on_done=lambda piece_idx: self._apply_bot_move(snapshot, piece_idx),
+                                           on_error=self._bot_failed)
+
+    def _apply_bot_move(self, snapshot, piece_idx):
+        self._bot_job = None
+        if snapshot.state != self.game.state: # The position moved on while the bot was thinking
+            self._schedule_bot()
+            return
+        self._bot_acting = True
+        try:
+            self.handle_piece_click(self.game.current_player_idx, piece_idx)
+        finally:
+            self._bot_acting = False
+
+    def _bot_failed(self, error):
+        self._bot_job = None
+        self.log_message(f"Computer player failed: {error!r}")
+
+    def _is_bot_turn(self):
+        return self._bot_for(self.game.current_player_idx) is not None and not self._bot_acting
+
+    def toggle_autoplay(self):
+        # Let autoplay_policy play every free seat, game after game, until switched off
+        self.autoplay = not self.autoplay
+        self.autoplay_var.set(self.autoplay)
+        if self.autoplay and self.autoplay_policy is None:
+            from ludo_sim import make_policy
+            self.autoplay_policy = make_policy("random")
+        if not self.autoplay:
+            if self._bot_after is not None:
+                self.master.after_cancel(self._bot_after)
+                self._bot_after = None
+            self.worker.cancel()
+            self._bot_job = None
+            self.log_message("Auto-play stopped.")
+            if not self.game.is_game_over():
+                self._schedule_bot() # Seats with their own bot keep playing
+        elif self.game.is_game_over():
+            self.reset_game()
+        else:
+            self.log_message("Auto-play started.")
+            self._schedule_bot()
+
+    def set_bot_delay(self, value):
+        # Scale callback; value arrives as a string
+        self.bot_delay_ms = int(float(value))
+
+    def _autoplay_game_over(self):
+        winner = next(seat for seat, player in enumerate(self.game.players) if player.all_pieces_finished())
+        self._autoplay_wins[winner] += 1
+        tally = ", ".join(f"{player.color} {wins}" for player, wins in zip(self.game.players, self._autoplay_wins))
+        self.log_message(f"{self.game.players[winner].name} wins. Auto-play wins: {tally}")
+        self._bot_after = self.master.after(max(self.autoplay_restart_ms, self.bot_delay_ms), self._autoplay_restart)
+
+    def _autoplay_restart(self):
+        self._bot_after = None
+        if self.autoplay:
+            self.reset_game()
+
+    def _create_pieces(self):
+        # Every piece gets one oval and one number, hidden until render_board places them
+        radius = self.cell_size_px / 3
+        for player_idx, player in enumerate(self.game.players):
+            player_gui_color = self.player_colors_map[player.color]
+            for piece_idx in range(len(player.pieces)):
+                tag = f"piece{player_idx}_{piece_idx}"
+                oval_id = self.board_canvas.create_oval(0, 0, 2 * radius, 2 * radius, fill=player_gui_color, outline="white", width=1, state="hidden", tags=tag)
+                text_id = self.board_canvas.create_text(radius, radius, text=str(piece_idx + 1), fill="white", font=("Arial", 10, "bold"), state="hidden", tags=tag) # Add piece number
+                self.board_canvas.tag_bind(tag, "<Button-1>", lambda e, p_idx=player_idx, pc_idx=piece_idx: self.handle_piece_click(p_idx, pc_idx))
+                self.piece_widgets[(player_idx, piece_idx)] = (oval_id, text_id)
+                self._piece_cells[(player_idx, piece_idx)] = None
+
+    def _piece_cell(self, color_name, piece_idx, piece_position):
+        if piece_position == 0:  # In base
+            return self.base_start_cell_coords[color_name][piece_idx]
+        if 1 <= piece_position <= 52: # On main path
+            if piece_position - 1 < len(self.path_coords):
+                return self.path_coords[piece_position - 1]
+        elif 53 <= piece_position < 100: # In home stretch
+            stretch = self.home_stretch_coords[color_name]
+            if piece_position - 53 < len(stretch):
+                return stretch[piece_position - 53]
+        return None
+
+    def render_board(self, moved=None):
+        # Move only the pieces whose cell changed since the last render; moved
+        # limits the check to [player_idx, piece_idx, position] entries from
+        # game.changes_since()
+        radius = self.cell_size_px / 3
+        if moved is None:
+            moved = [(player_idx, piece_idx, piece_position)
+                     for player_idx, player in enumerate(self.game.players)
+                     for piece_idx, piece_position in enumerate(player.pieces)]
+        for player_idx, piece_idx, piece_position in moved:
+            key = (player_idx, piece_idx)
+            cell = self._piece_cell(self.game.players[player_idx].color, piece_idx, piece_position)
+            if cell == self._piece_cells[key]:
+                continue
+            self._piece_cells[key] = cell
+            oval_id, text_id = self.piece_widgets[key]
+            if cell is None:
+                self.board_canvas.itemconfig(oval_id, state="hidden")
+                self.board_canvas.itemconfig(text_id, state="hidden")
+                continue
+            r, c = cell
+            x_center = (c * self.cell_size_px) + (self.cell_size_px / 2)
+            y_center = (r * self.cell_size_px) + (self.cell_size_px / 2)
+            self.board_canvas.coords(oval_id, x_center - radius, y_center - radius, x_center + radius, y_center + radius)
+            self.board_canvas.coords(text_id, x_center, y_center)
+            self.board_canvas.itemconfig(oval_id, state="normal")
+            self.board_canvas.itemconfig(text_id, state="normal")
+
+        # Highlight current player's movable pieces, updating only what changed
         current_player_idx = self.game.current_player_idx
-        roll = self.game.last_roll
-        if roll is not None:
-            current_player = self.game.players[current_player_idx]
-            for piece_idx, position in enumerate(current_player.pieces):
-                # A piece is movable if it's in base and rolled a 6, or it's on the board/home stretch
-                # and there's a valid move (simplified check for now, can be improved)
-                is_movable = False
-                if position == 0 and roll == 6:
-                    is_movable = True
-                elif 0 < position < 100:
-                    # For now, assume any piece on the board or home stretch is movable
-                    # This needs more sophisticated logic based on actual Ludo rules (e.g., blocking, exact landing)
-                    # For the current simple implementation, we'll allow movement if roll is available
-                    is_movable = True
-                
-                if is_movable:
-                    piece_id = self.piece_widgets.get((current_player_idx, piece_idx))
-                    if piece_id:
-                        self.board_canvas.itemconfig(piece_id, outline="yellow", width=3) # Highlight movable pieces
+        highlighted = {(current_player_idx, piece_idx) for piece_idx in self.game.legal_moves()}
+        for key in self._highlighted - highlighted:
+            self.board_canvas.itemconfig(self.piece_widgets[key][0], outline="white", width=1)
+        for key in highlighted - self._highlighted:
+            self.board_canvas.itemconfig(self.piece_widgets[key][0], outline="yellow", width=3) # Highlight movable pieces
+        self._highlighted = highlighted
 
     def _get_path_coordinates(self):
         # Red's path (clockwise from start)
@@ -431,6 +489,9 @@ class LudoGUI:
         if self.game.is_game_over():
             messagebox.showinfo("Game Over", "The game is already over!")
             return
+        if self._is_bot_turn():
+            self.log_message("Wait for the computer player to finish its turn.")
+            return
         
         roll_result = self.game.roll_dice()
         if roll_result.get("lost_turn"):
@@ -440,19 +501,16 @@ class LudoGUI:
 
         self.update_gui()
 
-        player = self.game.players[self.game.current_player_idx]
-        movable_pieces_indices = [
-            i
-            for i, position in enumerate(player.pieces)
-            if (position > 0 and position < 100) or (position == 0 and self.game.last_roll == 6)
-        ]
-        if not movable_pieces_indices and not (self.game.last_roll == 6 and any(p == 0 for p in player.pieces)):
+        if not self.game.legal_moves():
             self.log_message(f"Player {self.game.current_player_idx + 1} has no valid moves. Next turn.")
             self.game.last_roll = None # Clear last roll if no moves possible
             self.game.next_player()
             self.update_gui()
 
     def handle_piece_click(self, player_idx, piece_idx):
+        if self._is_bot_turn():
+            self.log_message("Wait for the computer player to finish its turn.")
+            return
         if player_idx != self.game.current_player_idx:
             self.log_message("It's not your turn!")
             return
@@ -460,9 +518,7 @@ class LudoGUI:
             self.log_message("You must roll the dice first!")
             return
         
-        # More robust check for movable pieces
-        movable_pieces = self.game.get_movable_pieces(self.game.players[player_idx], self.game.last_roll)
-        if piece_idx not in movable_pieces:
+        if piece_idx not in self.game.legal_moves():
             self.log_message(f"Piece {piece_idx + 1} is not a valid move with a roll of {self.game.last_roll}.")
             return
 
@@ -479,16 +535,69 @@ class LudoGUI:
         self.update_gui()
 
     def reset_game(self):
-        self.game = LudoGame() # Recreate game instance
+        if self._bot_after is not None:
+            self.master.after_cancel(self._bot_after)
+            self._bot_after = None
+        self.worker.cancel() # A search on the old game must not move on the new one
+        self._bot_job = None
+        self.game = LudoGame(SeededDice()) # Recreate game instance with fresh dice
         self.roll_button.config(state="normal")
         self.log_text.config(state="normal")
         self.log_text.delete(1.0, tk.END)
         self.log_text.config(state="disabled")
-        self.log_message("Game reset complete.")
+        self._log_shown = 0
+        self._version = -1
+        self.log_message(f"Game reset complete. Dice seed {self.game.seed}.")
         self.update_gui()
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play Ludo.")
+    parser.add_argument("--bot", action="append", default=[], metavar="SEAT=POLICY",
+                        help="Let a computer policy play a seat (1-4), e.g. 2=expectimax; repeatable")
+    parser.add_argument("--think", type=float, default=0.5, help="Seconds a search bot may spend per move")
+    parser.add_argument("--bot-workers", type=int, default=None, help="Processes for MCTS rollouts (default: CPU count)")
+    parser.add_argument("--tablebase", nargs="?", const="", default=None, metavar="PATH",
+                        help="Show endgame win chances from a tablebase file (default: ludo_endgame.tb)")
+    parser.add_argument("--autoplay", nargs="?", const="expectimax", default=None, metavar="POLICY",
+                        help="Start in auto-play: POLICY (default expectimax) plays every seat without a --bot")
+    parser.add_argument("--delay", type=int, default=LudoGUI.bot_delay_ms, help="Milliseconds between computer actions")
+    parser.add_argument("--seed", type=int, default=None, help="Dice seed of the first game, to replay it")
+    parser.add_argument("--profile", metavar="TRACE_JSON",
+                        help="Time hot paths and Tk callbacks; print a summary and write a Chrome trace on exit")
+    args = parser.parse_args(argv)
+
+    from ludo_sim import make_policy
+    bots = {}
+    for spec in args.bot:
+        seat, _, name = spec.partition("=")
+        bots[int(seat) - 1] = make_policy(name or "expectimax", time_budget=args.think, workers=args.bot_workers)
+
+    tablebase = None
+    if args.tablebase is not None:
+        from ludo_tablebase import DEFAULT_PATH, Tablebase
+        tablebase = Tablebase(args.tablebase or DEFAULT_PATH)
+
+    profiler = None
+    if args.profile:
+        from ludo_trace import Profiler
+        profiler = Profiler().enable(gui=True) # Before the GUI exists, so widget callbacks bind the wrappers
+
     root = tk.Tk()
-    gui = LudoGUI(root)
+    autoplay_policy = make_policy(args.autoplay or "random", time_budget=args.think, workers=args.bot_workers)
+    gui = LudoGUI(root, bots=bots, tablebase=tablebase, autoplay_policy=autoplay_policy, seed=args.seed)
+    gui.speed_scale.set(args.delay)
+    gui.bot_delay_ms = args.delay
+    if args.autoplay is not None:
+        gui.toggle_autoplay()
     root.mainloop()
+    gui.worker.shutdown()
+
+    if profiler is not None:
+        profiler.disable()
+        print(profiler.summary())
+        profiler.write_trace(args.profile)
+
+
+if __name__ == "__main__":
+    main()
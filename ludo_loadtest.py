@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from ludo_trace import percentile
+
+
+class HttpClient:
+    # One keep-alive HTTP/1.1 connection speaking JSON
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                           f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def play_session(host, port, deadline, latencies, counters, rng):
+    # Plays games back to back on one connection until the deadline
+    client = HttpClient(host, port)
+    await client.connect()
+    clock = time.perf_counter
+
+    async def timed(method, path, payload=None):
+        started = clock()
+        status, reply = await client.request(method, path, payload)
+        latencies.append(clock() - started)
+        if status >= 400:
+            counters["errors"] += 1
+        return status, reply
+
+    try:
+        session = None
+        while clock() < deadline:
+            if session is None:
+                _, reply = await timed("POST", "/sessions")
+                session = reply["session"]
+                counters["games"] += 1
+            _, reply = await timed("POST", f"/sessions/{session}/roll")
+            if reply.get("movable"):
+                _, reply = await timed("POST", f"/sessions/{session}/move", {"piece": rng.choice(reply["movable"])})
+                if reply.get("gameOver"):
+                    await timed("DELETE", f"/sessions/{session}")
+                    session = None
+    finally:
+        client.close()
+
+
+async def run_load(host, port, sessions, duration, seed=0, ramp=2.0):
+    latencies = []
+    counters = {"errors": 0, "games": 0}
+    rng = random.Random(seed)
+    deadline = time.perf_counter() + ramp + duration
+
+    async def start(index):
+        await asyncio.sleep(ramp * index / sessions) # Spread connection setup over the ramp
+        await play_session(host, port, deadline, latencies, counters, random.Random(rng.getrandbits(64)))
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(start(index) for index in range(sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, BaseException)]
+    return latencies, counters, failures, elapsed
+
+
+def free_port(host="127.0.0.1"):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(host, port):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ludo_server.py")
+    process = subprocess.Popen([sys.executable, script, "--host", host, "--port", str(port)], stdout=subprocess.PIPE)
+    process.stdout.readline() # "Serving Ludo on ..."
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a ludo_server.py instance.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-c", "--sessions", type=int, default=1000, help="Concurrent sessions (one connection each)")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds of full load after ramp-up")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which connections are opened")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--spawn", action="store_true", help="Start a local server on a free port for the run")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.spawn:
+        args.port = free_port(args.host)
+        server = spawn_server(args.host, args.port)
+    try:
+        latencies, counters, failures, elapsed = asyncio.run(
+            run_load(args.host, args.port, args.sessions, args.duration, args.seed, args.ramp))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    print(f"{args.sessions} sessions, {len(latencies)} requests in {elapsed:.1f}s "
+          f"({len(latencies) / elapsed:,.0f} req/s), {counters['games']} games started")
+    if latencies:
+        print(f"latency p50 {percentile(latencies, 50) * 1000:.2f} ms, p90 {percentile(latencies, 90) * 1000:.2f} ms, "
+              f"p99 {percentile(latencies, 99) * 1000:.2f} ms, max {percentile(latencies, 100) * 1000:.2f} ms")
+    print(f"{counters['errors']} error responses, {len(failures)} failed sessions")
+    if failures:
+        print(f"first failure: {failures[0]!r}")
+    return 1 if failures or counters["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from collections import deque
+from itertools import islice
+
+from ludo_rules import PLAYER_SEATS
+
+
+# Event kinds. Every event is a plain tuple (kind, seat, piece, src, dst, roll);
+# for EV_CAPTURED, src/dst are the captured seat and piece instead of positions.
+EV_ROLLED = 0
+EV_LOST_TURN = 1
+EV_NEEDS_SIX = 2
+EV_BEYOND_HOME = 3
+EV_ENTERED = 4
+EV_FINISHED = 5
+EV_WON = 6
+EV_MOVED = 7
+EV_STRETCH = 8
+EV_CAPTURED = 9
+
+LOG_SIZE = 1000 # Default ring size; older events are dropped
+
+
+def format_event(event):
+    kind, seat, piece, src, dst, roll = event
+    name, color = PLAYER_SEATS[seat]
+    if kind == EV_ROLLED:
+        return f"{name} rolled a {roll}"
+    if kind == EV_LOST_TURN:
+        return f"{name} rolled three 6s in a row and loses their turn."
+    if kind == EV_NEEDS_SIX:
+        return f"{name}'s {color} piece {piece+1} needs a 6 to move out of base."
+    if kind == EV_BEYOND_HOME:
+        return f"{name}'s {color} piece {piece+1} cannot move beyond home with {roll}."
+    if kind == EV_ENTERED:
+        return f"{name}'s {color} piece {piece+1} moved out of base to start position."
+    if kind == EV_FINISHED:
+        return f"{name}'s {color} piece {piece+1} reached home!"
+    if kind == EV_WON:
+        return f"Game Over! {name} wins!"
+    if kind == EV_MOVED:
+        return f"{name}'s {color} piece {piece+1} moved to {dst}."
+    if kind == EV_STRETCH:
+        return f"{name}'s {color} piece {piece+1} moved to {dst} (home stretch)."
+    if kind == EV_CAPTURED:
+        victim_name, victim_color = PLAYER_SEATS[src]
+        return f"{name}'s {color} piece {piece+1} landed on {victim_name}'s {victim_color} piece {dst+1}, sending it back to base!"
+    return f"Unknown event {event!r}"
+
+
+class GameLog:
+    # Bounded buffer of structured events; text is only built by text()/since_text().
+    # A size of 0 turns logging off, None keeps every event.
+    __slots__ = ("events", "seq", "enabled")
+
+    def __init__(self, size=LOG_SIZE):
+        self.events = deque(maxlen=size)
+        self.seq = 0 # Events ever recorded; the newest has number seq - 1
+        self.enabled = size != 0
+
+    def add(self, kind, seat, piece=0, src=0, dst=0, roll=0):
+        self.events.append((kind, seat, piece, src, dst, roll))
+        self.seq += 1
+
+    def first_seq(self):
+        # Number of the oldest event still buffered
+        return self.seq - len(self.events)
+
+    def since(self, seq):
+        # Events numbered seq and later that are still in the buffer
+        skip = max(seq - self.first_seq(), 0)
+        if skip >= len(self.events):
+            return []
+        return list(islice(self.events, skip, None))
+
+    def since_text(self, seq):
+        return [format_event(event) for event in self.since(seq)]
+
+    def text(self):
+        return [format_event(event) for event in self.events]
+
+    def clear(self):
+        self.events.clear()
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
@@ -0,0 +1,201 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ludo_ai import evaluate
+from ludo_dice import BatchedDice
+from ludo_game import LudoGame
+from ludo_sim import RandomPolicy, play_turn
+from ludo_state import GameState
+
+
+EXPLORATION = 1.4
+ROLLOUT_TURNS = 300 # Dice rolls per playout before the leader is scored as the winner
+MERGE_DEPTH = 3 # Tree levels each worker sends back to be merged
+
+
+class Node:
+    # Open-loop node: children are keyed by (seat, roll, piece) because the
+    # dice decide which moves exist, and passed or forfeited turns mean the
+    # same roll and piece can come up for different seats; roll_visits counts
+    # visits per seat and roll (index seat * 7 + roll) for UCT.
+    __slots__ = ("seat", "visits", "wins", "children", "roll_visits")
+
+    def __init__(self, seat=None):
+        self.seat = seat # Seat whose move led here; wins are counted for it
+        self.visits = 0
+        self.wins = 0.0
+        self.children = {}
+        self.roll_visits = [0] * 28
+
+    def to_dict(self, depth):
+        children = {}
+        if depth > 0:
+            children = {key: child.to_dict(depth - 1) for key, child in self.children.items()}
+        return (self.seat, self.visits, self.wins, list(self.roll_visits), children)
+
+    def merge(self, data):
+        seat, visits, wins, roll_visits, children = data
+        self.seat = seat
+        self.visits += visits
+        self.wins += wins
+        for index, count in enumerate(roll_visits):
+            self.roll_visits[index] += count
+        for key, child_data in children.items():
+            child = self.children.get(key)
+            if child is None:
+                child = self.children[key] = Node(child_data[0])
+            child.merge(child_data)
+
+
+def _select(node, seat, roll, movable, exploration):
+    parent_visits = math.log(node.roll_visits[seat * 7 + roll] or 1)
+    best_piece, best_score = None, None
+    for piece_idx in movable:
+        child = node.children[(seat, roll, piece_idx)]
+        score = child.wins / child.visits + exploration * math.sqrt(parent_visits / child.visits)
+        if best_score is None or score > best_score:
+            best_piece, best_score = piece_idx, score
+    return best_piece
+
+
+def _next_roll(game):
+    # Roll until someone may move; forfeited turns just pass the dice on
+    while True:
+        result = game.roll_dice()
+        if not result["lost_turn"]:
+            return result["roll"]
+
+
+def _winner(game):
+    for seat, player in enumerate(game.players):
+        if player.all_pieces_finished():
+            return seat
+    values = evaluate(game)
+    return max(range(4), key=values.__getitem__)
+
+
+def _iterate(root, game, root_state, root_roll, rng, playout, exploration):
+    game.load_state(root_state) # One working game per search, reset in place
+    node = root
+    path = [root]
+    roll = root_roll
+    while not game.is_game_over():
+        seat = game.current_player_idx
+        movable = game.legal_moves(roll)
+        if not movable:
+            game.last_roll = None
+            game.next_player()
+            roll = _next_roll(game)
+            continue
+
+        node.roll_visits[seat * 7 + roll] += 1
+        untried = [piece_idx for piece_idx in movable if (seat, roll, piece_idx) not in node.children]
+        if untried:
+            piece_idx = rng.choice(untried)
+            child = node.children[(seat, roll, piece_idx)] = Node(seat)
+            node = child
+            path.append(node)
+            game.make_move(piece_idx, roll)
+            break
+
+        piece_idx = _select(node, seat, roll, movable, exploration)
+        node = node.children[(seat, roll, piece_idx)]
+        path.append(node)
+        game.make_move(piece_idx, roll)
+        if game.is_game_over():
+            break
+        roll = _next_roll(game)
+
+    turns = 0
+    while not game.is_game_over() and turns < ROLLOUT_TURNS:
+        play_turn(game, playout)
+        turns += 1
+
+    winner = _winner(game)
+    for visited in path:
+        visited.visits += 1
+        if visited.seat == winner:
+            visited.wins += 1
+
+
+def search(state_bytes, rollouts=None, time_budget=1.0, seed=None, exploration=EXPLORATION, merge_depth=MERGE_DEPTH):
+    # One independent search from a GameState snapshot whose last roll is
+    # pending; runs in a worker process for root parallelism.
+    rng = random.Random(seed)
+    game = LudoGame(BatchedDice(rng.getrandbits(63)), GameState(state_bytes), log_size=0) # Rollouts roll a lot
+    root_roll = game.last_roll
+    playout = [RandomPolicy(rng.getrandbits(64))] * 4
+    root = Node()
+
+    started = time.perf_counter()
+    deadline = started + time_budget if time_budget else None
+    done = 0
+    while rollouts is None or done < rollouts:
+        if deadline is not None and not done & 15 and time.perf_counter() > deadline:
+            break
+        _iterate(root, game, state_bytes, root_roll, rng, playout, exploration)
+        done += 1
+    return root.to_dict(merge_depth), done, time.perf_counter() - started
+
+
+class MCTSPlayer:
+    # Root-parallel MCTS: each worker searches the same position on its own
+    # and the parent merges the top of every worker tree into one tree.
+    def __init__(self, rollouts=None, time_budget=1.0, workers=1, exploration=EXPLORATION, seed=None):
+        if rollouts is None and not time_budget:
+            raise ValueError("MCTSPlayer needs a rollout count, a time budget or both")
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.tree = None
+        self.last_rollouts = 0
+        self.last_rates = [] # Rollouts/sec of each worker in the last search
+        self._executor = None
+
+    def __call__(self, game, movable):
+        if len(movable) == 1:
+            return movable[0]
+
+        state_bytes = game.state.key()
+        per_worker = None if self.rollouts is None else max(1, -(-self.rollouts // self.workers))
+        seeds = [self.rng.getrandbits(64) for _ in range(self.workers)]
+        if self.workers == 1:
+            results = [search(state_bytes, per_worker, self.time_budget, seeds[0], self.exploration)]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [self._executor.submit(search, state_bytes, per_worker, self.time_budget, seed, self.exploration)
+                       for seed in seeds]
+            results = [future.result() for future in futures]
+
+        self.tree = Node()
+        self.last_rates = []
+        self.last_rollouts = 0
+        for tree_data, done, elapsed in results:
+            self.tree.merge(tree_data)
+            self.last_rollouts += done
+            self.last_rates.append(done / elapsed if elapsed else 0.0)
+
+        seat, roll = game.current_player_idx, game.last_roll
+        return max(movable, key=lambda piece_idx: self._visits(seat, roll, piece_idx))
+
+    def _visits(self, seat, roll, piece_idx):
+        child = self.tree.children.get((seat, roll, piece_idx))
+        return child.visits if child else 0
+
+    def report(self):
+        rates = self.last_rates
+        if not rates:
+            return "no search yet"
+        per_core = ", ".join(f"{rate:,.0f}" for rate in rates)
+        return f"{self.last_rollouts} rollouts, {sum(rates):,.0f}/sec total ({per_core} per core)"
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
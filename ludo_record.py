@@ -0,0 +1,308 @@
+import argparse
+import mmap
+import random
+import struct
+import time
+
+from ludo_dice import ScriptedDice, SeededDice
+from ludo_game import LudoGame
+from ludo_rules import BEYOND_HOME, ENTER, FINISH, MOVE, MOVE_TABLE, NEEDS_SIX
+from ludo_sim import MAX_TURNS, RandomPolicy, play_turn
+from ludo_state import CURRENT, FINISHED, GAME_OVER, PIECES, SIXES, STATE_SIZE, GameState
+
+
+# One byte per roll: the roll in the low 3 bits, the chosen piece above them.
+NO_MOVE = 7 # No piece moved: the turn was forfeited or there was nothing to move
+
+FILE_MAGIC = b"LUDA"
+INDEX_MAGIC = b"LUDX"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB3x")
+RECORD_HEADER = struct.Struct("<QIb3x") # seed (0 if unknown), move count, winner seat (-1 none)
+TRAILER = struct.Struct("<QQ4s") # index offset, record count, magic
+OFFSET = struct.Struct("<Q")
+
+
+def pack_move(roll, choice=NO_MOVE):
+    return roll | choice << 3
+
+
+def unpack_move(byte):
+    return byte & 7, byte >> 3
+
+
+class GameRecorder:
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.moves = bytearray()
+        self._pending_roll = None
+
+    def on_roll(self, roll, lost_turn):
+        self._flush()
+        if lost_turn:
+            self.moves.append(pack_move(roll))
+        else:
+            self._pending_roll = roll
+
+    def on_move(self, piece_idx, steps):
+        if self._pending_roll is None:
+            return # A move without a roll can't be replayed, e.g. a scripted setup
+        self.moves.append(pack_move(self._pending_roll, piece_idx))
+        self._pending_roll = None
+
+    def _flush(self):
+        # A roll nobody moved on was a pass
+        if self._pending_roll is not None:
+            self.moves.append(pack_move(self._pending_roll))
+            self._pending_roll = None
+
+    def finish(self):
+        self._flush()
+        return bytes(self.moves)
+
+
+class RecordedGame(LudoGame):
+    # LudoGame that reports every roll and piece choice to a GameRecorder
+    __slots__ = ("recorder",)
+
+    def __init__(self, *args, recorder=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recorder = recorder if recorder is not None else GameRecorder(self.seed or 0) # Archives keep the dice seed
+
+    def apply_roll(self, roll):
+        result = super().apply_roll(roll)
+        self.recorder.on_roll(roll, result["lost_turn"])
+        return result
+
+    def move_piece(self, player, piece_idx, steps):
+        self.recorder.on_move(piece_idx, steps)
+        return super().move_piece(player, piece_idx, steps)
+
+
+def winner_of(data):
+    for seat in range(4):
+        if data[FINISHED + seat] == 4:
+            return seat
+    return -1
+
+
+def replay_moves(moves, data=None):
+    # Applies recorded moves straight to GameState bytes, following the same
+    # turn flow as ludo_sim.play_turn without building result dicts or logs
+    data = bytearray(STATE_SIZE) if data is None else data
+    for byte in moves:
+        roll = byte & 7
+        choice = byte >> 3
+        seat = data[CURRENT]
+        if roll == 6:
+            streak = data[SIXES + seat] + 1
+            if streak == 3:
+                data[SIXES + seat] = 0
+                data[CURRENT] = (seat + 1) % 4
+                continue
+            data[SIXES + seat] = streak
+        else:
+            data[SIXES + seat] = 0
+
+        if choice == NO_MOVE:
+            data[CURRENT] = (seat + 1) % 4
+            continue
+
+        slot = PIECES + seat * 4 + choice
+        outcome, destination = MOVE_TABLE[seat][data[slot]][roll]
+        if outcome == NEEDS_SIX:
+            advance = True
+        elif outcome == BEYOND_HOME:
+            advance = roll != 6
+        else:
+            data[slot] = destination
+            advance = outcome != ENTER and roll != 6
+            if outcome == FINISH:
+                data[FINISHED + seat] += 1
+                if data[FINISHED + seat] == 4:
+                    data[GAME_OVER] = 1
+            elif outcome == MOVE:
+                for other in range(PIECES, PIECES + 16):
+                    if data[other] == destination and (other - PIECES) // 4 != seat:
+                        data[other] = 0
+        if advance:
+            data[CURRENT] = (seat + 1) % 4
+    return data
+
+
+def replay_with_engine(moves, log_size=0):
+    # Slow reference replay through LudoGame itself, used by verify
+    game = LudoGame(ScriptedDice(roll for roll, _ in map(unpack_move, moves)), log_size=log_size)
+    for byte in moves:
+        roll, choice = unpack_move(byte)
+        if game.roll_dice()["lost_turn"]:
+            continue
+        if choice == NO_MOVE:
+            game.last_roll = None
+            game.next_player()
+            continue
+        result = game.move_piece(game.players[game.current_player_idx], choice, roll)
+        if result.get("next_player", True):
+            game.next_player()
+        game.last_roll = None
+    return game
+
+
+class GameRecord:
+    __slots__ = ("index", "seed", "winner", "moves")
+
+    def __init__(self, index, seed, winner, moves):
+        self.index = index
+        self.seed = seed
+        self.winner = winner
+        self.moves = moves
+
+    def replay(self):
+        return LudoGame(state=GameState(replay_moves(self.moves)), log_size=0)
+
+    def __repr__(self):
+        return f"GameRecord(index={self.index}, seed={self.seed}, winner={self.winner}, moves={len(self.moves)})"
+
+
+class ArchiveWriter:
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.file.write(FILE_HEADER.pack(FILE_MAGIC, VERSION))
+        self.offsets = []
+
+    def write(self, moves, winner=-1, seed=0):
+        self.offsets.append(self.file.tell())
+        self.file.write(RECORD_HEADER.pack(seed, len(moves), winner))
+        self.file.write(moves)
+
+    def write_game(self, game):
+        self.write(game.recorder.finish(), winner_of(game.state.data), game.recorder.seed)
+
+    def close(self):
+        if self.file.closed:
+            return
+        index_offset = self.file.tell()
+        self.file.write(struct.pack(f"<{len(self.offsets)}Q", *self.offsets))
+        self.file.write(TRAILER.pack(index_offset, len(self.offsets), INDEX_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveReader:
+    # Memory-maps an archive; records are decoded only when accessed
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self.map, 0)
+        if magic != FILE_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Ludo archive")
+        index_offset, count, index_magic = TRAILER.unpack_from(self.map, len(self.map) - TRAILER.size)
+        if index_magic != INDEX_MAGIC:
+            raise ValueError(f"{path} has no index (was the writer closed?)")
+        self.index_offset = index_offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"game {index} out of range, archive has {self.count}")
+        offset, = OFFSET.unpack_from(self.map, self.index_offset + index * OFFSET.size)
+        seed, length, winner = RECORD_HEADER.unpack_from(self.map, offset)
+        start = offset + RECORD_HEADER.size
+        return GameRecord(index, seed, winner, self.map[start:start + length])
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def replay_all(self):
+        # Lazily yields (record, final GameState bytes)
+        for record in self:
+            yield record, replay_moves(record.moves)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record_games(path, n_games, seed=0, max_turns=MAX_TURNS):
+    rng = random.Random(seed)
+    with ArchiveWriter(path) as writer:
+        for _ in range(n_games):
+            game_seed = rng.getrandbits(63) or 1
+            game = RecordedGame(SeededDice(game_seed), log_size=0)
+            policies = [RandomPolicy(game_seed)] * 4
+            turns = 0
+            while not game.is_game_over() and turns < max_turns:
+                play_turn(game, policies)
+                turns += 1
+            writer.write_game(game)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay compact binary Ludo game archives.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Simulate games and archive them")
+    generate.add_argument("path")
+    generate.add_argument("-n", "--games", type=int, default=10000)
+    generate.add_argument("-s", "--seed", type=int, default=0)
+    replay = commands.add_parser("replay", help="Replay every game and report throughput")
+    replay.add_argument("path")
+    show = commands.add_parser("show", help="Replay one game by index")
+    show.add_argument("path")
+    show.add_argument("index", type=int)
+    verify = commands.add_parser("verify", help="Check fast replay against LudoGame for the first N games")
+    verify.add_argument("path")
+    verify.add_argument("-n", "--games", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        record_games(args.path, args.games, args.seed)
+        return 0
+
+    with ArchiveReader(args.path) as reader:
+        if args.command == "replay":
+            started = time.perf_counter()
+            wins = [0, 0, 0, 0]
+            games = 0
+            for record, data in reader.replay_all():
+                games += 1
+                if record.winner >= 0:
+                    wins[record.winner] += 1
+            elapsed = time.perf_counter() - started
+            print(f"Replayed {games} games in {elapsed:.2f}s ({games / elapsed * 60:,.0f} games/min); wins by seat {wins}")
+        elif args.command == "show":
+            record = reader[args.index]
+            print(record)
+            print(record.replay().state)
+        else:
+            mismatches = 0
+            for record in reader:
+                if record.index >= args.games:
+                    break
+                engine = replay_with_engine(record.moves)
+                if engine.state.data != replay_moves(record.moves) or winner_of(engine.state.data) != record.winner:
+                    mismatches += 1
+                    print(f"Mismatch in game {record.index}")
+            print(f"{min(args.games, len(reader))} games checked, {mismatches} mismatches")
+            return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
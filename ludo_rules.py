@@ -0,0 +1,94 @@
+PLAYER_SEATS = [
+    ("Player 1", "Red"),
+    ("Player 2", "Green"),
+    ("Player 3", "Blue"),
+    ("Player 4", "Yellow"),
+]
+START_POSITIONS = {
+    "Red": 1,
+    "Green": 14,
+    "Yellow": 27,
+    "Blue": 40
+}
+HOME_STRETCH_POSITIONS = {
+    "Red": [52, 53, 54, 55, 56, 57], # Positions before entering home
+    "Green": [13, 12, 11, 10, 9, 8], # These will need to be mapped to global board positions
+    "Yellow": [26, 25, 24, 23, 22, 21],
+    "Blue": [39, 38, 37, 36, 35, 34]
+}
+
+BOARD_SIZE = 52
+HOME_POSITION = BOARD_SIZE + 6 # Exact landing spot that finishes a piece
+FINISHED_POSITION = 100
+
+# Squares a piece of each seat covers from its start square to the exact home
+# landing; also the squares it can stand on before finishing, counting base
+TRACK_LENGTHS = [HOME_POSITION - START_POSITIONS[color] + 1 for _, color in PLAYER_SEATS]
+
+# Move outcomes, as stored in MOVE_TABLE
+NEEDS_SIX = 0    # In base without a 6
+ENTER = 1        # Base -> start square
+MOVE = 2         # Along the main board, may capture
+MOVE_SAFE = 3    # Onto the mover's own start square, never captures
+STRETCH = 4      # Into or along the home stretch
+FINISH = 5       # Exact landing on HOME_POSITION
+BEYOND_HOME = 6  # Overshoots home (or the piece is already finished)
+
+MOVED_OUTCOMES = (ENTER, MOVE, MOVE_SAFE, STRETCH, FINISH)
+
+# Bitmask of the 16 piece slots (seat * 4 + piece) belonging to everyone but a seat
+OPPONENT_MASKS = tuple(0xFFFF & ~(0xF << (seat * 4)) for seat in range(len(PLAYER_SEATS)))
+
+
+def _move_outcome(start_pos, position, roll):
+    if position == 0:
+        return (ENTER, start_pos) if roll == 6 else (NEEDS_SIX, 0)
+    new_position = position + roll
+    if new_position > BOARD_SIZE:
+        if new_position > HOME_POSITION:
+            return BEYOND_HOME, position
+        if new_position == HOME_POSITION:
+            return FINISH, FINISHED_POSITION
+        return STRETCH, new_position
+    return (MOVE_SAFE if new_position == start_pos else MOVE), new_position
+
+
+def _build_move_table():
+    # MOVE_TABLE[seat][position][roll] -> (outcome, destination); roll 0 is unused
+    table = []
+    for _, color in PLAYER_SEATS:
+        start_pos = START_POSITIONS[color]
+        table.append(tuple(
+            (None,) + tuple(_move_outcome(start_pos, position, roll) for roll in range(1, 7))
+            for position in range(FINISHED_POSITION + 1)
+        ))
+    return tuple(table)
+
+
+MOVE_TABLE = _build_move_table()
+
+# MOVE_TABLE as flat bytes in [seat][position][roll] order, for array code:
+# np.frombuffer(MOVE_OUTCOMES, np.uint8).reshape(MOVE_TABLE_SHAPE). Roll 0
+# reads as NEEDS_SIX to square 0.
+MOVE_TABLE_SHAPE = (len(PLAYER_SEATS), FINISHED_POSITION + 1, 7)
+MOVE_OUTCOMES = bytes(entry[0] if entry else NEEDS_SIX for by_position in MOVE_TABLE
+                      for by_roll in by_position for entry in by_roll)
+MOVE_DESTINATIONS = bytes(entry[1] if entry else 0 for by_position in MOVE_TABLE
+                          for by_roll in by_position for entry in by_roll)
+
+
+def _build_legal_table():
+    # LEGAL_MOVES[seat][roll][position] -> 1 when move_piece would move that piece.
+    # Roll 0 (no pending roll) allows nothing.
+    return tuple(
+        tuple(bytes(int(roll > 0 and by_position[position][roll][0] in MOVED_OUTCOMES)
+                    for position in range(FINISHED_POSITION + 1))
+              for roll in range(7))
+        for by_position in MOVE_TABLE
+    )
+
+
+LEGAL_MOVES = _build_legal_table()
+
+# Piece indices set in a 4-bit legal-move mask, lowest first
+MASK_PIECES = tuple(tuple(piece_idx for piece_idx in range(4) if mask >> piece_idx & 1) for mask in range(16))
@@ -0,0 +1,407 @@
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import secrets
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from ludo_dice import SeededDice
+from ludo_game import LudoGame
+from ludo_state import GameState, StateHistory
+
+
+IDLE_TIMEOUT = 300.0 # Seconds without requests before a session is snapshotted and evicted
+SWEEP_INTERVAL = 10.0
+SERVER_LOG_SIZE = 200
+MAX_SNAPSHOTS = 100000 # Evicted sessions kept; the oldest are dropped beyond this
+SNAPSHOT_TTL = 24 * 3600.0 # Seconds an evicted session can still be restored
+MAX_BODY = 64 * 1024
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+STATUS_TEXT = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               409: "Conflict", 413: "Payload Too Large"}
+
+
+def is_int(value):
+    # JSON integers only; bool is an int subclass but true/false are not numbers here
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Session:
+    __slots__ = ("id", "game", "seed", "lock", "last_used")
+
+    def __init__(self, session_id, game, seed):
+        self.id = session_id
+        self.game = game
+        self.seed = seed
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    def snapshot(self):
+        # Compact record to bring the session back after eviction: the state
+        # bytes, how far the seeded dice have got, and the log and state
+        # versions. Log lines themselves are dropped; clients resync from a full state.
+        game = self.game
+        return (game.state.key(), self.seed, game.dice.drawn, game.log.seq, game.version)
+
+    @classmethod
+    def restore(cls, session_id, snapshot, log_size=SERVER_LOG_SIZE):
+        state_bytes, seed, drawn, seq, version = snapshot
+        game = LudoGame(SeededDice(seed, drawn), GameState(state_bytes), log_size=log_size)
+        game.log.seq = seq
+        game.history = StateHistory(version=version) # Clients keep their version; older ones get a full state
+        return cls(session_id, game, seed)
+
+    def roll(self):
+        game = self.game
+        if game.is_game_over():
+            raise ApiError(409, "The game is already over")
+        if game.last_roll is not None:
+            raise ApiError(409, f"Move a piece for the pending roll of {game.last_roll} first")
+
+        seat = game.current_player_idx
+        result = game.roll_dice()
+        movable = []
+        passed = False
+        if not result["lost_turn"]:
+            movable = game.get_movable_pieces(game.players[seat], result["roll"])
+            if not movable:
+                game.last_roll = None
+                game.next_player()
+                passed = True
+        return {"seat": seat, "roll": result["roll"], "lostTurn": result["lost_turn"], "movable": movable,
+                "passed": passed, "currentPlayerIndex": game.current_player_idx, "version": game.version}
+
+    def move(self, piece_idx):
+        game = self.game
+        roll = game.last_roll
+        if roll is None:
+            raise ApiError(409, "Roll the dice first")
+        seat = game.current_player_idx
+        if piece_idx not in game.get_movable_pieces(game.players[seat], roll):
+            raise ApiError(400, f"Piece {piece_idx} is not a valid move with a roll of {roll}")
+
+        result = game.move_piece(game.players[seat], piece_idx, roll)
+        if result.get("next_player", True):
+            game.next_player()
+        game.last_roll = None
+        return {"seat": seat, "piece": piece_idx, "roll": roll, "moved": result["moved"],
+                "position": game.players[seat].pieces[piece_idx], "gameOver": game.is_game_over(),
+                "currentPlayerIndex": game.current_player_idx, "version": game.version}
+
+
+class SessionManager:
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, log_size=SERVER_LOG_SIZE, max_snapshots=MAX_SNAPSHOTS,
+                 snapshot_ttl=SNAPSHOT_TTL):
+        self.idle_timeout = idle_timeout
+        self.log_size = log_size
+        self.max_snapshots = max_snapshots
+        self.snapshot_ttl = snapshot_ttl
+        self.sessions = {}
+        self.snapshots = {} # Evicted sessions, oldest first: id -> (evicted at, Session.snapshot())
+        self.evictions = 0
+        self.restores = 0
+        self.expired = 0
+
+    def create(self, seed=None):
+        session_id = secrets.token_hex(8)
+        seed = secrets.randbits(63) if seed is None else seed
+        game = LudoGame(SeededDice(seed), log_size=self.log_size)
+        session = self.sessions[session_id] = Session(session_id, game, seed)
+        return session
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            evicted = self.snapshots.pop(session_id, None)
+            if evicted is None:
+                raise ApiError(404, f"No session {session_id!r}")
+            session = self.sessions[session_id] = Session.restore(session_id, evicted[1], self.log_size)
+            self.restores += 1
+        session.last_used = time.monotonic()
+        return session
+
+    def delete(self, session_id):
+        if self.sessions.pop(session_id, None) is None and self.snapshots.pop(session_id, None) is None:
+            raise ApiError(404, f"No session {session_id!r}")
+
+    def evict_idle(self, now=None):
+        now = time.monotonic() if now is None else now
+        idle = [session for session in self.sessions.values()
+                if now - session.last_used > self.idle_timeout and not session.lock.locked()]
+        for session in idle:
+            self.snapshots[session.id] = (now, session.snapshot())
+            del self.sessions[session.id]
+        self.evictions += len(idle)
+        self.expire_snapshots(now)
+        return len(idle)
+
+    def expire_snapshots(self, now=None):
+        # Drops the oldest snapshots once they outlive snapshot_ttl or exceed max_snapshots
+        now = time.monotonic() if now is None else now
+        expired = []
+        for session_id, (evicted_at, _) in self.snapshots.items():
+            if now - evicted_at <= self.snapshot_ttl and len(self.snapshots) - len(expired) <= self.max_snapshots:
+                break
+            expired.append(session_id)
+        for session_id in expired:
+            del self.snapshots[session_id]
+        self.expired += len(expired)
+        return len(expired)
+
+    def stats(self):
+        return {"active": len(self.sessions), "evicted": len(self.snapshots),
+                "evictions": self.evictions, "restores": self.restores,
+                "expired": self.expired}
+
+
+class LudoServer:
+    # HTTP/1.1 (keep-alive) and WebSocket front end over a SessionManager:
+    #   POST   /sessions               create a session, optionally {"seed": n} to replay a game
+    #   GET    /sessions/<id>          full game_state()
+    #   GET    /sessions/<id>/changes?since=<version>
+    #                                  changes_since(), a full state when too far behind
+    #   POST   /sessions/<id>/roll     roll for the current player
+    #   POST   /sessions/<id>/move     {"piece": n} for the pending roll
+    #   DELETE /sessions/<id>
+    #   GET    /stats
+    #   GET    /ws                     WebSocket, JSON messages {"op": ..., "session": ..., "piece": ..., "since": ..., "seed": ...}
+    def __init__(self, manager=None, sweep_interval=SWEEP_INTERVAL):
+        self.manager = manager if manager is not None else SessionManager()
+        self.sweep_interval = sweep_interval
+
+    # --- API shared by HTTP and WebSocket ---
+
+    async def call(self, op, session_id=None, piece=None, since=None, seed=None):
+        manager = self.manager
+        if not isinstance(op, str):
+            raise ApiError(400, "Missing string 'op'")
+        if op == "create":
+            if seed is not None and not is_int(seed):
+                raise ApiError(400, "'seed' must be an integer")
+            session = manager.create(seed) # The same seed and moves replay a game exactly
+            return 201, {"session": session.id, "seed": session.seed}
+        if op == "stats":
+            return 200, manager.stats()
+        if not isinstance(session_id, str):
+            raise ApiError(400, "Missing string session id")
+        if op == "delete":
+            manager.delete(session_id)
+            return 200, {"deleted": session_id}
+
+        session = manager.get(session_id)
+        async with session.lock:
+            if op == "state":
+                return 200, session.game.game_state()
+            if op == "changes":
+                if not is_int(since):
+                    raise ApiError(400, "Missing integer 'since' version")
+                return 200, session.game.changes_since(since)
+            if op == "roll":
+                return 200, session.roll()
+            if op == "move":
+                if not is_int(piece):
+                    raise ApiError(400, "Missing integer 'piece'")
+                return 200, session.move(piece)
+        raise ApiError(400, f"Unknown operation {op!r}")
+
+    def route(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        payload = json.loads(body) if body else {}
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        if parts == ["sessions"] and method == "POST":
+            return ("create", None, None, None, payload.get("seed"))
+        if parts == ["stats"] and method == "GET":
+            return ("stats", None, None, None)
+        if len(parts) == 2 and parts[0] == "sessions":
+            if method == "GET":
+                return ("state", parts[1], None, None)
+            if method == "DELETE":
+                return ("delete", parts[1], None, None)
+        if len(parts) == 3 and parts[0] == "sessions" and method == "GET" and parts[2] == "changes":
+            since = parse_qs(url.query).get("since", [None])[0]
+            return ("changes", parts[1], None, int(since) if since is not None else None)
+        if len(parts) == 3 and parts[0] == "sessions" and method == "POST" and parts[2] in ("roll", "move"):
+            return (parts[2], parts[1], payload.get("piece"), None)
+        raise ApiError(404 if method in ("GET", "POST", "DELETE") else 405, f"No route for {method} {url.path}")
+
+    # --- HTTP ---
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.handle_websocket(reader, writer, headers)
+                    break
+
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.call(*self.route(method, target, body))
+                except ApiError as error:
+                    status, payload = error.status, {"error": error.message}
+                except ValueError as error:
+                    status, payload = 400, {"error": f"Bad request: {error}"}
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode()
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    # --- WebSocket (RFC 6455, unfragmented text frames) ---
+
+    async def handle_websocket(self, reader, writer, headers):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        while True:
+            opcode, payload = await read_frame(reader)
+            if opcode == 0x8: # Close
+                writer.write(encode_frame(b"", 0x8))
+                await writer.drain()
+                return
+            if opcode == 0x9: # Ping
+                writer.write(encode_frame(payload, 0xA))
+                await writer.drain()
+                continue
+            if opcode != 0x1:
+                continue
+
+            request_id = None
+            try:
+                message = json.loads(payload)
+                if not isinstance(message, dict):
+                    raise ApiError(400, "Message must be a JSON object")
+                request_id = message.get("id")
+                status, reply = await self.call(message.get("op"), message.get("session"), message.get("piece"),
+                                                message.get("since"), message.get("seed"))
+                reply = {"ok": True, "status": status, **reply}
+            except ApiError as error:
+                reply = {"ok": False, "status": error.status, "error": error.message}
+            except (ValueError, AttributeError) as error:
+                reply = {"ok": False, "status": 400, "error": f"Bad message: {error}"}
+            if request_id is not None:
+                reply["id"] = request_id
+            writer.write(encode_frame(json.dumps(reply).encode()))
+            await writer.drain()
+
+    # --- Lifecycle ---
+
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.manager.evict_idle()
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        sweeper = asyncio.create_task(self.sweep())
+        if ready is not None:
+            ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            sweeper.cancel()
+
+
+async def read_frame(reader):
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    if length > MAX_BODY:
+        raise ValueError("WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+        payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big")
+    return opcode, payload
+
+
+def encode_frame(payload, opcode=0x1, mask=None):
+    # Server frames go out unmasked; clients pass a 4-byte mask
+    length = len(payload)
+    head = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        head.append(mask_bit | length)
+    elif length < 1 << 16:
+        head.append(mask_bit | 126)
+        head += length.to_bytes(2, "big")
+    else:
+        head.append(mask_bit | 127)
+        head += length.to_bytes(8, "big")
+    if mask:
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], "big")
+        payload = (int.from_bytes(payload, "big") ^ key).to_bytes(length, "big") if length else b""
+        head += mask
+    return bytes(head) + payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many Ludo games over HTTP and WebSocket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="Seconds before an idle session is snapshotted and evicted")
+    args = parser.parse_args(argv)
+
+    server = LudoServer(SessionManager(idle_timeout=args.idle_timeout))
+
+    def ready(_):
+        # Printed once the port is bound; ludo_loadtest --spawn waits for this line
+        print(f"Serving Ludo on http://{args.host}:{args.port}", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
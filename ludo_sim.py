@@ -0,0 +1,291 @@
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ludo_dice import DICE, make_dice
+from ludo_game import LudoGame
+from ludo_rules import PLAYER_SEATS
+
+
+MAX_TURNS = 2000 # Dice rolls per game before it is abandoned as unfinished
+CHUNK_SIZE = 200
+UNFINISHED_SEEDS = 5 # Seeds of unfinished games kept for --replay; the rest are only counted
+
+
+# --- Move-choice policies ---
+# A policy is any callable policy(game, movable) -> piece index, called with
+# game.last_roll already set and movable taken from game.get_movable_pieces().
+
+def first_movable(game, movable):
+    return movable[0]
+
+
+def furthest_ahead(game, movable):
+    pieces = game.players[game.current_player_idx].pieces
+    return max(movable, key=lambda i: pieces[i])
+
+
+def rearmost(game, movable):
+    pieces = game.players[game.current_player_idx].pieces
+    return min(movable, key=lambda i: pieces[i])
+
+
+class RandomPolicy:
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def __call__(self, game, movable):
+        return self.rng.choice(movable)
+
+
+def expectimax_policy(seed=None, time_budget=0.1, **options):
+    from ludo_ai import ExpectimaxPlayer
+    return ExpectimaxPlayer(time_budget=time_budget)
+
+
+def tablebase_policy(seed=None, time_budget=0.1, path=None, fallback="expectimax", **options):
+    from ludo_tablebase import DEFAULT_PATH, Tablebase, TablebasePlayer
+    return TablebasePlayer(Tablebase(path or DEFAULT_PATH), make_policy(fallback, seed=seed, time_budget=time_budget, **options))
+
+
+def mcts_policy(seed=None, time_budget=0.1, rollouts=None, workers=1, **options):
+    from ludo_mcts import MCTSPlayer
+    return MCTSPlayer(rollouts=rollouts, time_budget=time_budget, workers=workers, seed=seed)
+
+
+# name -> factory(seed=None, **options); factories ignore options they don't use
+POLICIES = {
+    "random": lambda seed=None, **options: RandomPolicy(seed),
+    "expectimax": expectimax_policy,
+    "mcts": mcts_policy,
+    "tablebase": tablebase_policy,
+    "first": lambda seed=None, **options: first_movable,
+    "furthest": lambda seed=None, **options: furthest_ahead,
+    "rearmost": lambda seed=None, **options: rearmost,
+}
+
+
+def make_policy(name, seed=None, **options):
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy {name!r}, expected one of: {', '.join(sorted(POLICIES))}")
+    return POLICIES[name](seed=seed, **options)
+
+
+# --- Headless game loop ---
+
+def play_turn(game, policies):
+    # One dice roll, mirroring LudoGUI.roll_dice / handle_piece_click
+    roll_result = game.roll_dice()
+    if roll_result["lost_turn"]:
+        return
+
+    player = game.players[game.current_player_idx]
+    movable = game.get_movable_pieces(player, game.last_roll)
+    if not movable:
+        game.last_roll = None
+        game.next_player()
+        return
+
+    piece_idx = policies[game.current_player_idx](game, movable)
+    result = game.move_piece(player, piece_idx, game.last_roll)
+    if result.get("next_player", True):
+        game.next_player()
+    game.last_roll = None
+
+
+def play_game(policies, dice=None, max_turns=MAX_TURNS, game=None):
+    if game is None:
+        game = LudoGame(dice, log_size=0)
+    turns = 0
+    while not game.is_game_over() and turns < max_turns:
+        play_turn(game, policies)
+        turns += 1
+
+    winner = None
+    for seat, player in enumerate(game.players):
+        if player.all_pieces_finished():
+            winner = seat
+            break
+    return winner, turns
+
+
+# --- Aggregated results ---
+
+class SimStats:
+    def __init__(self):
+        self.games = 0
+        self.unfinished = 0
+        self.wins = [0, 0, 0, 0]
+        self.turns = Counter() # turn count -> games, bounded by max_turns
+        self.unfinished_seeds = [] # game_seed() of the first UNFINISHED_SEEDS games that hit max_turns, to replay them
+        self.cpu_seconds = 0.0
+
+    def add_game(self, winner, turns, seed=None):
+        self.games += 1
+        if winner is None:
+            self.unfinished += 1
+            if seed is not None and len(self.unfinished_seeds) < UNFINISHED_SEEDS:
+                self.unfinished_seeds.append(seed)
+        else:
+            self.wins[winner] += 1
+        self.turns[turns] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.unfinished += other.unfinished
+        for seat, wins in enumerate(other.wins):
+            self.wins[seat] += wins
+        self.turns.update(other.turns)
+        self.unfinished_seeds.extend(other.unfinished_seeds[:UNFINISHED_SEEDS - len(self.unfinished_seeds)])
+        self.cpu_seconds += other.cpu_seconds
+        return self
+
+    def win_rates(self):
+        return [wins / self.games if self.games else 0.0 for wins in self.wins]
+
+    def turn_percentile(self, pct):
+        if not self.games:
+            return None
+        target = pct / 100 * self.games
+        seen = 0
+        for turns in sorted(self.turns):
+            seen += self.turns[turns]
+            if seen >= target:
+                return turns
+        return max(self.turns)
+
+    def mean_turns(self):
+        if not self.games:
+            return None
+        return sum(turns * count for turns, count in self.turns.items()) / self.games
+
+
+def game_seed(seed, game_idx):
+    # Seed of one game of a batch, whichever chunk or worker plays it
+    return random.Random(f"{seed}:{game_idx}").getrandbits(63)
+
+
+def seeded_policies(policy_names, game_seed, **options):
+    # Fresh policies per game, seeded from the game seed, so dice seeded the
+    # same way replay the game (for policies that don't depend on timing)
+    return [make_policy(name, seed=game_seed + seat, **options) for seat, name in enumerate(policy_names)]
+
+
+def run_chunk(policy_names, first_game, n_games, seed, max_turns=MAX_TURNS, dice="batched"):
+    stats = SimStats()
+    started = time.process_time()
+    for game_idx in range(first_game, first_game + n_games):
+        gseed = game_seed(seed, game_idx)
+        winner, turns = play_game(seeded_policies(policy_names, gseed), make_dice(dice, gseed), max_turns)
+        stats.add_game(winner, turns, gseed)
+    stats.cpu_seconds = time.process_time() - started
+    return stats
+
+
+def iter_tasks(task, task_args, workers=1):
+    # Yields task(*args) for each tuple in task_args as it finishes, in any
+    # order. At most 2 * workers tasks are in flight, so memory stays flat
+    # however many there are. task must be picklable when workers > 1.
+    if workers == 1:
+        for args in task_args:
+            yield task(*args)
+        return
+
+    pending = iter(task_args)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = set()
+        try:
+            for args in pending:
+                in_flight.add(executor.submit(task, *args))
+                if len(in_flight) >= 2 * workers:
+                    break
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    for args in pending:
+                        in_flight.add(executor.submit(task, *args))
+                        break
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def iter_chunks(policy_names, n_games, seed=0, workers=None, chunk_size=CHUNK_SIZE, max_turns=MAX_TURNS, dice="batched"):
+    # Yields one SimStats per finished chunk
+    policy_names = list(policy_names)
+    if len(policy_names) != 4:
+        raise ValueError("Exactly one policy per seat (4) is required")
+    workers = workers or os.cpu_count() or 1
+    chunks = ((policy_names, start, min(chunk_size, n_games - start), seed, max_turns, dice)
+              for start in range(0, n_games, chunk_size))
+    yield from iter_tasks(run_chunk, chunks, workers)
+
+
+def run_batch(policy_names, n_games, seed=0, workers=None, chunk_size=CHUNK_SIZE, max_turns=MAX_TURNS, progress=None,
+              dice="batched"):
+    total = SimStats()
+    started = time.perf_counter()
+    for stats in iter_chunks(policy_names, n_games, seed, workers, chunk_size, max_turns, dice):
+        total.merge(stats)
+        if progress:
+            progress(total, time.perf_counter() - started)
+    return total, time.perf_counter() - started
+
+
+def format_report(stats, elapsed, policy_names):
+    lines = [
+        f"Games: {stats.games} in {elapsed:.2f}s ({stats.games / elapsed if elapsed else 0:.0f} games/sec, "
+        f"{stats.cpu_seconds:.2f} CPU s)",
+        f"Unfinished (hit turn limit): {stats.unfinished}"
+        + (f", seeds {stats.unfinished_seeds}" if stats.unfinished_seeds else ""),
+        f"Turns: mean {stats.mean_turns() or 0:.1f}, p50 {stats.turn_percentile(50)}, "
+        f"p90 {stats.turn_percentile(90)}, p99 {stats.turn_percentile(99)}, max {max(stats.turns, default=None)}",
+        "Win rates by seat:",
+    ]
+    for seat, rate in enumerate(stats.win_rates()):
+        lines.append(f"  Seat {seat + 1} ({PLAYER_SEATS[seat][1]}, {policy_names[seat]}): {rate:.2%} ({stats.wins[seat]})")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless Ludo games in parallel.")
+    parser.add_argument("-n", "--games", type=int, default=10000)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("-p", "--policy", action="append", default=None,
+                        help=f"Policy per seat, repeat up to 4 times ({', '.join(sorted(POLICIES))})")
+    parser.add_argument("--dice", choices=sorted(DICE), default="batched", help="Dice source for every game")
+    parser.add_argument("--replay", type=int, default=None, metavar="GAME_SEED",
+                        help="Play the single game with this seed and print its log")
+    args = parser.parse_args(argv)
+
+    policy_names = args.policy or ["random"]
+    if len(policy_names) == 1:
+        policy_names = policy_names * 4
+    for name in policy_names:
+        make_policy(name) # Fail fast on a bad name, before spawning workers
+
+    if args.replay is not None:
+        game = LudoGame(make_dice(args.dice, args.replay), log_size=None)
+        winner, turns = play_game(seeded_policies(policy_names, args.replay), max_turns=args.max_turns, game=game)
+        print("\n".join(game.game_log))
+        print(f"Winner: {'none' if winner is None else game.players[winner].name} after {turns} turns")
+        return
+
+    def progress(stats, elapsed):
+        print(f"\r{stats.games}/{args.games} games, {stats.games / elapsed:.0f} games/sec", end="", flush=True)
+
+    stats, elapsed = run_batch(policy_names, args.games, args.seed, args.workers, args.chunk_size,
+                               args.max_turns, progress=progress, dice=args.dice)
+    print()
+    print(format_report(stats, elapsed, policy_names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+from collections import deque
+
+
+# Fixed-size byte layout of a whole game position. Offsets index GameState.data.
+PIECES = 0       # 16 bytes, seat * 4 + piece: 0 base, 1-52 board, 53-57 home stretch, 100 finished
+CURRENT = 16     # Seat to move
+SIXES = 17       # 4 bytes, sixes rolled in a row per seat
+LAST_ROLL = 21   # Pending roll, 0 when there is none
+FINISHED = 22    # 4 bytes, finished pieces per seat
+GAME_OVER = 26
+STATE_SIZE = 27
+
+HISTORY_SIZE = 64 # Versions kept for changes_since(); older clients get a full snapshot
+
+
+class GameState:
+    __slots__ = ("data",)
+
+    def __init__(self, data=None):
+        self.data = bytearray(STATE_SIZE) if data is None else bytearray(data)
+        if len(self.data) != STATE_SIZE:
+            raise ValueError(f"GameState needs {STATE_SIZE} bytes, got {len(self.data)}")
+
+    def clone(self):
+        return GameState(self.data)
+
+    def key(self):
+        # Immutable snapshot, usable as a dict key or sent across processes
+        return bytes(self.data)
+
+    def pieces(self, seat):
+        return list(self.data[PIECES + seat * 4:PIECES + seat * 4 + 4])
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self.data == other.data
+
+    def __hash__(self):
+        # Hash of the current contents; don't mutate a state while it is a dict key
+        return hash(bytes(self.data))
+
+    def __repr__(self):
+        data = self.data
+        return (f"GameState(pieces={[self.pieces(seat) for seat in range(4)]}, current={data[CURRENT]}, "
+                f"last_roll={data[LAST_ROLL] or None}, sixes={list(data[SIXES:SIXES + 4])}, "
+                f"game_over={bool(data[GAME_OVER])})")
+
+
+class StateHistory:
+    # Recently observed states numbered by a version that only ever grows. A new
+    # version is taken when the state bytes or the log sequence differ from the
+    # last observation, so mutations between two reads share one version.
+    __slots__ = ("entries", "version")
+
+    def __init__(self, size=HISTORY_SIZE, version=0):
+        self.entries = deque(maxlen=size) # (version, state bytes, log seq), consecutive versions
+        self.version = version
+
+    def observe(self, data, log_seq):
+        entries = self.entries
+        if entries:
+            _, last_data, last_seq = entries[-1]
+            if last_seq == log_seq and last_data == data:
+                return self.version
+            self.version += 1
+        entries.append((self.version, bytes(data), log_seq))
+        return self.version
+
+    def find(self, version):
+        # (state bytes, log seq) as of version, or None once it has been dropped
+        first = self.version - len(self.entries) + 1
+        if not first <= version <= self.version:
+            return None
+        _, data, log_seq = self.entries[version - first]
+        return data, log_seq
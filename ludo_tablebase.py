@@ -0,0 +1,479 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from itertools import combinations
+
+from ludo_rules import FINISHED_POSITION, PLAYER_SEATS, START_POSITIONS, TRACK_LENGTHS
+from ludo_state import CURRENT, FINISHED, GAME_OVER, LAST_ROLL, PIECES, SIXES
+
+
+# Exact win chances for duels: two seats with one or two unfinished pieces
+# each, the turn passing straight between them under move_piece's movement
+# and capture rules. The side to move's six streak is part of the position;
+# a streak is dropped when the turn passes. In a four-seat game a lookup
+# treats the other two seats as out of the game.
+
+MAX_PIECES = 2
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ludo_endgame.tb")
+
+FILE_MAGIC = b"LUTB"
+VERSION = 1
+SCALE = 65535 # Probabilities are stored as uint16 fractions of SCALE
+FILE_HEADER = struct.Struct("<4sBBH") # magic, version, max pieces, table count
+TABLE_ENTRY = struct.Struct("<BBBBIIQ") # seat a, seat b, pieces a, pieces b, configs of b, total configs, byte offset
+VALUE = struct.Struct("<H")
+
+
+def progress(seat, position):
+    # 0 in base, 1 on the start square, TRACK_LENGTHS[seat] - 1 one step from home
+    return 0 if position == 0 else position - START_POSITIONS[PLAYER_SEATS[seat][1]] + 1
+
+
+def multiset_count(track_length, pieces):
+    return track_length if pieces == 1 else track_length * (track_length + 1) // 2
+
+
+def multiset_index(steps):
+    # Index of a sorted tuple of 1 or 2 progress values
+    if len(steps) == 1:
+        return steps[0]
+    low, high = steps
+    return high * (high + 1) // 2 + low
+
+
+def table_keys(max_pieces=MAX_PIECES):
+    # Every (seat a, seat b, pieces a, pieces b) table, smaller endgames first
+    keys = [(seat_a, seat_b, pieces_a, pieces_b)
+            for seat_a, seat_b in combinations(range(len(PLAYER_SEATS)), 2)
+            for pieces_a in range(1, max_pieces + 1)
+            for pieces_b in range(1, max_pieces + 1)]
+    return sorted(keys, key=lambda key: (key[2] + key[3], key))
+
+
+# --- Generation (needs NumPy) ---
+
+class _Solver:
+    # Value iteration over one seat pair. All tables of the pair share one flat
+    # array laid out [mover][streak][config] per table, configs sorted by total
+    # progress; slots 0 and 1 hold a certain loss and win.
+    LOSE = 0
+    WIN = 1
+
+    def __init__(self, np, seat_a, seat_b, max_pieces, tolerance):
+        from ludo_rules import FINISH, MOVE, MOVE_DESTINATIONS, MOVE_OUTCOMES, MOVE_TABLE_SHAPE, MOVED_OUTCOMES
+
+        self.np = np
+        self.seats = (seat_a, seat_b)
+        self.tolerance = tolerance
+        self.outcomes = np.frombuffer(MOVE_OUTCOMES, dtype=np.uint8).reshape(MOVE_TABLE_SHAPE)
+        self.destinations = np.frombuffer(MOVE_DESTINATIONS, dtype=np.uint8).reshape(MOVE_TABLE_SHAPE)
+        self.moved = np.isin(np.arange(self.outcomes.max() + 1), MOVED_OUTCOMES)
+        self.finish = FINISH
+        self.capture = MOVE
+        self.tables = {}
+        size = 2
+        for pieces_a in range(1, max_pieces + 1):
+            for pieces_b in range(1, max_pieces + 1):
+                table = self._layout(pieces_a, pieces_b)
+                table["offset"] = size
+                size += 6 * table["configs"]
+                self.tables[(pieces_a, pieces_b)] = table
+        self.values = np.zeros(size)
+        self.values[self.WIN] = 1.0
+
+    def _multisets(self, seat, pieces):
+        np = self.np
+        length = TRACK_LENGTHS[self.seats[seat]]
+        if pieces == 1:
+            return np.arange(length, dtype=np.int64)[:, None]
+        high, low = np.tril_indices(length) # Row-major, so index = high * (high + 1) / 2 + low
+        return np.stack([low, high], axis=1).astype(np.int64)
+
+    def _layout(self, pieces_a, pieces_b):
+        np = self.np
+        steps_a = self._multisets(0, pieces_a)
+        steps_b = self._multisets(1, pieces_b)
+        count_b = len(steps_b)
+        configs = len(steps_a) * count_b
+        own = [np.repeat(steps_a, count_b, axis=0), np.tile(steps_b, (len(steps_a), 1))]
+        level = own[0].sum(axis=1) + own[1].sum(axis=1)
+        order = np.argsort(level, kind="stable")
+        rank = np.empty(configs, dtype=np.int64)
+        rank[order] = np.arange(configs)
+        bounds = np.searchsorted(level[order], np.arange(level.max() + 2))
+        return {"pieces": (pieces_a, pieces_b), "count_b": count_b, "configs": configs, "steps": own,
+                "order": order, "rank": rank, "bounds": bounds}
+
+    def _index(self, table, mover, streak, rank):
+        return table["offset"] + (mover * 3 + streak) * table["configs"] + rank
+
+    def _config_index(self, table, steps):
+        np = self.np
+        index = []
+        for side in (0, 1):
+            side_steps = np.sort(steps[side], axis=1)
+            if side_steps.shape[1] == 1:
+                index.append(side_steps[:, 0])
+            else:
+                index.append(side_steps[:, 1] * (side_steps[:, 1] + 1) // 2 + side_steps[:, 0])
+        return index[0] * table["count_b"] + index[1]
+
+    def _successors(self, table, mover, roll, piece_idx, streak=0):
+        # Flat value index after the move for every config (natural order), -1 if
+        # the move is illegal. Rolls 1-5 point at the opponent's turn start; a 6
+        # lets the mover roll again at streak + 1.
+        np = self.np
+        seat = self.seats[mover]
+        start = START_POSITIONS[PLAYER_SEATS[seat][1]]
+        steps = [table["steps"][0].copy(), table["steps"][1].copy()]
+        own = steps[mover]
+        step = own[:, piece_idx]
+        position = np.where(step == 0, 0, step + start - 1)
+        outcome = self.outcomes[seat, position, roll]
+        destination = self.destinations[seat, position, roll].astype(np.int64)
+        legal = self.moved[outcome]
+        finished = outcome == self.finish
+        own[:, piece_idx] = np.where(finished, 0, destination - start + 1)
+
+        # Captured opponents return to base
+        other = steps[1 - mover]
+        other_start = START_POSITIONS[PLAYER_SEATS[self.seats[1 - mover]][1]]
+        other_position = np.where(other == 0, 0, other + other_start - 1)
+        hit = (outcome == self.capture)[:, None] & (other_position == destination[:, None])
+        other[hit] = 0
+
+        result = np.full(table["configs"], -1, dtype=np.int64)
+        next_mover, next_streak = (mover, streak + 1) if roll == 6 else (1 - mover, 0)
+        pieces = list(table["pieces"])
+        for finishing in (False, True):
+            rows = np.flatnonzero(legal & (finished == finishing))
+            if not len(rows):
+                continue
+            if finishing and pieces[mover] == 1:
+                result[rows] = self.WIN if roll == 6 else self.LOSE # Last piece home: the mover has won
+                continue
+            target = table
+            target_steps = [steps[0][rows], steps[1][rows]]
+            if finishing:
+                target_pieces = list(pieces)
+                target_pieces[mover] -= 1
+                target = self.tables[tuple(target_pieces)]
+                target_steps[mover] = np.delete(target_steps[mover], piece_idx, axis=1)
+            rank = target["rank"][self._config_index(target, target_steps)]
+            result[rows] = self._index(target, next_mover, next_streak, rank)
+        return result
+
+    def solve(self, pieces_a, pieces_b, progress=None):
+        table = self.tables[(pieces_a, pieces_b)]
+        order = table["order"]
+        configs = table["configs"]
+        # moves[mover][i] -> successor indices per piece, in rank order, for
+        # rolls 1-5 and then a 6 rolled at streak 0 and at streak 1
+        moves = [[[self._successors(table, mover, roll, piece_idx, streak)[order]
+                   for piece_idx in range(table["pieces"][mover])]
+                  for roll, streak in ((1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (6, 1))]
+                 for mover in (0, 1)]
+        values = self.values
+        sweeps = 0
+        while True:
+            delta = 0.0
+            bounds = table["bounds"]
+            for level in range(len(bounds) - 2, -1, -1):
+                low, high = bounds[level], bounds[level + 1]
+                if low == high:
+                    continue
+                delta = max(delta, self._solve_level(table, moves, low, high))
+            sweeps += 1
+            if progress:
+                progress(self.seats, table["pieces"], sweeps, delta)
+            if delta < self.tolerance:
+                break
+        # Back to natural config order for lookups
+        start = table["offset"]
+        block = values[start:start + 6 * configs].reshape(6, configs)
+        return self.np.rint(block[:, table["rank"]] * SCALE).astype("<u2")
+
+    def _solve_level(self, table, moves, low, high):
+        np = self.np
+        values = self.values
+        rolls_below_six = []
+        roll_six = []
+        for mover in (0, 1):
+            total = np.zeros(high - low)
+            stuck = np.zeros(high - low) # Rolls 1-5 with no legal move
+            for roll in range(5):
+                best = None
+                for successors in moves[mover][roll]:
+                    index = successors[low:high]
+                    value = np.where(index >= 0, 1.0 - values[np.maximum(index, 0)], -1.0)
+                    best = value if best is None else np.maximum(best, value)
+                legal = best >= 0
+                total += np.where(legal, best, 0.0)
+                stuck += ~legal
+            rolls_below_six.append((total, stuck))
+            best_six = []
+            for streak in (0, 1):
+                best = None
+                for successors in moves[mover][5 + streak]:
+                    index = successors[low:high]
+                    value = np.where(index >= 0, values[np.maximum(index, 0)], -1.0)
+                    best = value if best is None else np.maximum(best, value)
+                best_six.append(best)
+            roll_six.append(best_six)
+
+        # Turn start (streak 0): W_a = c_a + q_a (1 - W_b) and W_b = c_b + q_b (1 - W_a),
+        # where q is the chance of having to pass
+        c, q = [], []
+        for mover in (0, 1):
+            total, stuck = rolls_below_six[mover]
+            best_one = roll_six[mover][0]
+            c.append((total + np.where(best_one >= 0, best_one, 0.0)) / 6)
+            q.append((stuck + (best_one < 0)) / 6)
+        start_a = (c[0] + q[0] * (1 - c[1] - q[1])) / (1 - q[0] * q[1])
+        start_b = c[1] + q[1] * (1 - start_a)
+        turn_start = (start_a, start_b)
+
+        delta = 0.0
+        for mover in (0, 1):
+            total, stuck = rolls_below_six[mover]
+            pass_value = 1.0 - turn_start[1 - mover]
+            below_six = total + stuck * pass_value
+            best_two = roll_six[mover][1]
+            new = (turn_start[mover],
+                   (below_six + np.where(best_two >= 0, best_two, pass_value)) / 6,
+                   (below_six + pass_value) / 6) # Third six forfeits the turn
+            for streak in (0, 1, 2):
+                index = self._index(table, mover, streak, low)
+                old = values[index:index + high - low]
+                delta = max(delta, float(np.abs(old - new[streak]).max()))
+                values[index:index + high - low] = new[streak]
+        return delta
+
+
+def build(path=DEFAULT_PATH, max_pieces=MAX_PIECES, tolerance=1e-9, progress=None):
+    import numpy as np
+
+    keys = table_keys(max_pieces)
+    solved = {}
+    for seat_a, seat_b in combinations(range(len(PLAYER_SEATS)), 2):
+        solver = _Solver(np, seat_a, seat_b, max_pieces, tolerance)
+        for key in keys:
+            if key[:2] == (seat_a, seat_b):
+                solved[key] = solver.solve(key[2], key[3], progress)
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(FILE_HEADER.pack(FILE_MAGIC, VERSION, max_pieces, len(keys)))
+        offset = FILE_HEADER.size + TABLE_ENTRY.size * len(keys)
+        for key in keys:
+            seat_a, seat_b, pieces_a, pieces_b = key
+            count_b = multiset_count(TRACK_LENGTHS[seat_b], pieces_b)
+            configs = solved[key].shape[1]
+            f.write(TABLE_ENTRY.pack(seat_a, seat_b, pieces_a, pieces_b, count_b, configs, offset))
+            offset += 6 * configs * VALUE.size
+        for key in keys:
+            f.write(solved[key].tobytes())
+    os.replace(path + ".tmp", path)
+
+
+# --- Lookup (no NumPy needed) ---
+
+def remaining(data, seat):
+    return [position for position in data[PIECES + seat * 4:PIECES + seat * 4 + 4] if position != FINISHED_POSITION]
+
+
+def duel_opponent(game, seat, max_pieces=MAX_PIECES):
+    # The opponent closest to winning (fewest pieces left, then most progress),
+    # or None when seat or that opponent has too many pieces left for the tables
+    data = game.state.data
+    if not 0 < len(remaining(data, seat)) <= max_pieces:
+        return None
+    def closeness(other):
+        left = remaining(data, other)
+        return (-len(left), sum(progress(other, position) for position in left))
+    opponents = [other for other in range(len(PLAYER_SEATS)) if other != seat and remaining(data, other)]
+    if not opponents:
+        return None
+    opponent = max(opponents, key=closeness)
+    return opponent if len(remaining(data, opponent)) <= max_pieces else None
+
+
+class Tablebase:
+    # Memory-maps a tablebase file; every probe is a couple of index
+    # computations and one 2-byte read
+    def __init__(self, path=DEFAULT_PATH):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_pieces, count = FILE_HEADER.unpack_from(self.map, 0)
+        if magic != FILE_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} Ludo tablebase")
+        self.max_pieces = max_pieces
+        self.tables = {}
+        for index in range(count):
+            seat_a, seat_b, pieces_a, pieces_b, count_b, configs, offset = TABLE_ENTRY.unpack_from(
+                self.map, FILE_HEADER.size + index * TABLE_ENTRY.size)
+            self.tables[(seat_a, seat_b, pieces_a, pieces_b)] = (count_b, configs, offset)
+
+    def lookup(self, state, seat, opponent):
+        # Chance that seat beats opponent from a position with no pending roll;
+        # None when the position is not in the tables
+        data = state.data
+        left = remaining(data, seat)
+        other_left = remaining(data, opponent)
+        if not left or not other_left:
+            return 0.0 if left else 1.0
+        if data[LAST_ROLL] or data[GAME_OVER]:
+            return None
+        seat_a, seat_b = sorted((seat, opponent))
+        entry = self.tables.get((seat_a, seat_b, len(remaining(data, seat_a)), len(remaining(data, seat_b))))
+        if entry is None:
+            return None
+        count_b, configs, offset = entry
+
+        # Seats outside the duel are skipped: the next of the pair in turn order moves
+        current = data[CURRENT]
+        mover = current
+        while mover != seat_a and mover != seat_b:
+            mover = (mover + 1) % len(PLAYER_SEATS)
+        streak = data[SIXES + current] if mover == current else 0
+        config = (multiset_index(sorted(progress(seat_a, position) for position in remaining(data, seat_a))) * count_b
+                  + multiset_index(sorted(progress(seat_b, position) for position in remaining(data, seat_b))))
+        value, = VALUE.unpack_from(self.map, offset + (((mover == seat_b) * 3 + streak) * configs + config) * VALUE.size)
+        chance = value / SCALE
+        return chance if mover == seat else 1.0 - chance
+
+    def win_chance(self, game, seat, opponent=None):
+        # lookup() that also handles a pending roll: the side to move plays
+        # its best move for the roll, or passes when it has none
+        if opponent is None:
+            opponent = duel_opponent(game, seat, self.max_pieces)
+            if opponent is None:
+                return None
+        roll = game.last_roll
+        if roll is None:
+            return self.lookup(game.state, seat, opponent)
+        mover = game.current_player_idx
+        if mover != seat and mover != opponent:
+            return None
+        movable = game.legal_moves()
+        if not movable: # The turn passes
+            data = game.state.data
+            saved = bytes(data)
+            game.last_roll = None
+            game.next_player()
+            chance = self.lookup(game.state, seat, opponent)
+            data[:] = saved
+            return chance
+        best = None
+        for piece_idx in movable:
+            undo = game.make_move(piece_idx)
+            chance = self.lookup(game.state, mover, opponent if mover == seat else seat)
+            game.unmake_move(undo)
+            if chance is None:
+                return None
+            best = chance if best is None else max(best, chance)
+        return best if mover == seat else 1.0 - best
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TablebasePlayer:
+    # Plays the move with the best tablebase win chance against the closest
+    # opponent once both are in the tables; any other policy plays the rest
+    def __init__(self, tablebase=None, fallback=None):
+        self.tablebase = tablebase if tablebase is not None else Tablebase()
+        self.fallback = fallback
+        self.probes = 0
+
+    def __call__(self, game, movable):
+        seat = game.current_player_idx
+        opponent = duel_opponent(game, seat, self.tablebase.max_pieces) if len(movable) > 1 else None
+        if opponent is not None:
+            best_piece, best_chance = None, None
+            for piece_idx in movable:
+                undo = game.make_move(piece_idx)
+                chance = self.tablebase.lookup(game.state, seat, opponent)
+                game.unmake_move(undo)
+                if chance is None:
+                    break
+                if best_chance is None or chance > best_chance:
+                    best_piece, best_chance = piece_idx, chance
+            else:
+                self.probes += len(movable)
+                return best_piece
+        return self.fallback(game, movable) if self.fallback is not None else movable[0]
+
+
+def verify(tablebase, samples=2000, seed=0):
+    # Checks random table positions against one dice roll played through
+    # LudoGame: each value must equal the average over rolls of the best
+    # successor value. Returns the largest difference seen.
+    import random
+    from ludo_game import LudoGame
+
+    rng = random.Random(seed)
+    keys = list(tablebase.tables)
+    worst = 0.0
+    for _ in range(samples):
+        seat_a, seat_b, pieces_a, pieces_b = rng.choice(keys)
+        game = LudoGame(log_size=0)
+        data = game.state.data
+        data[PIECES:PIECES + 16] = bytes([FINISHED_POSITION]) * 16 # Seats outside the duel have nothing to move
+        for seat, pieces in ((seat_a, pieces_a), (seat_b, pieces_b)):
+            start = START_POSITIONS[PLAYER_SEATS[seat][1]]
+            for piece_idx in range(pieces):
+                step = rng.randrange(TRACK_LENGTHS[seat])
+                data[PIECES + seat * 4 + piece_idx] = 0 if step == 0 else start + step - 1
+            data[FINISHED + seat] = 4 - pieces
+        data[CURRENT] = rng.choice((seat_a, seat_b))
+        data[SIXES + data[CURRENT]] = rng.choice((0, 0, 1, 2))
+        game._index_board()
+        mover, opponent = data[CURRENT], seat_a + seat_b - data[CURRENT]
+
+        expected = 0.0
+        for roll in range(1, 7):
+            roll_undo = game.make_roll(roll)
+            expected += tablebase.win_chance(game, mover, opponent) if game.last_roll else tablebase.lookup(game.state, mover, opponent)
+            game.unmake_move(roll_undo)
+        worst = max(worst, abs(expected / 6 - tablebase.lookup(game.state, mover, opponent)))
+    return worst
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and check the Ludo endgame tablebase.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Solve every table and write the file (needs NumPy)")
+    build_parser.add_argument("-o", "--output", default=DEFAULT_PATH)
+    build_parser.add_argument("--max-pieces", type=int, choices=(1, 2), default=MAX_PIECES,
+                              help="Unfinished pieces per seat to cover")
+    verify_parser = commands.add_parser("verify", help="Check table values against the engine")
+    verify_parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    verify_parser.add_argument("-n", "--samples", type=int, default=2000)
+    verify_parser.add_argument("-s", "--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        started = time.perf_counter()
+        build(args.output, args.max_pieces,
+              progress=lambda seats, pieces, sweeps, delta: print(f"seats {seats} pieces {pieces}: sweep {sweeps}, change {delta:.2e}"))
+        print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB) in {time.perf_counter() - started:.0f}s")
+        return 0
+
+    with Tablebase(args.path) as tablebase:
+        started = time.perf_counter()
+        worst = verify(tablebase, args.samples, args.seed)
+        print(f"{args.samples} positions checked in {time.perf_counter() - started:.1f}s, largest difference {worst:.2e}")
+        return 0 if worst < 1e-3 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
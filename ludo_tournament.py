@@ -0,0 +1,262 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+from ludo_dice import DICE, make_dice
+from ludo_rules import PLAYER_SEATS
+from ludo_sim import MAX_TURNS, POLICIES, game_seed, iter_tasks, make_policy, play_game, seeded_policies
+
+
+SHARD_SIZE = 50 # Games per worker task and per checkpoint line
+ELO_SCALE = 400 / math.log(10) # Elo points per unit of log-odds
+ELO_BASE = 1500
+PRIOR_SD = 2.0 # Log-odds; keeps ratings finite while a policy has no wins yet
+Z95 = 1.959964
+
+
+def seatings(n_policies):
+    # Every assignment of policy indices to the four seats with at least two
+    # different policies at the table; each policy sits in each seat equally often
+    return [seating for seating in itertools.product(range(n_policies), repeat=len(PLAYER_SEATS))
+            if len(set(seating)) > 1]
+
+
+def run_shard(policy_names, start, size, seed, max_turns=MAX_TURNS, dice="batched", think=0.1):
+    # Games start..start + size - 1 of the tournament. Game i uses seating
+    # i % len(seatings), so every shard covers the seatings evenly.
+    table = seatings(len(policy_names))
+    results = []
+    for game_idx in range(start, start + size):
+        gseed = game_seed(seed, game_idx)
+        names = [policy_names[policy] for policy in table[game_idx % len(table)]]
+        winner, turns = play_game(seeded_policies(names, gseed, time_budget=think), make_dice(dice, gseed), max_turns)
+        results.append([-1 if winner is None else winner, turns])
+    return start, results
+
+
+class Checkpoint:
+    # Append-only JSON lines: the tournament settings, then one line per
+    # finished shard, synced to disk before the shard counts as done. A torn
+    # last line from an interrupted write is cut off on resume.
+    def __init__(self, path, header):
+        self.path = path
+        self.shards = {} # start -> results
+        if os.path.exists(path) and os.path.getsize(path):
+            self._load(header)
+            self.file = open(path, "a")
+        else:
+            self.file = open(path, "w")
+            self._write(header)
+
+    def _load(self, header):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        lines = data.split(b"\n")
+        if json.loads(lines[0]) != header:
+            raise ValueError(f"{self.path} belongs to a different tournament; remove it or use another --checkpoint")
+        good = len(lines[0]) + 1
+        for line in lines[1:]:
+            if not line:
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if good + len(line) >= len(data): # No newline after it, so the write may be incomplete
+                break
+            self.shards[record["start"]] = record["results"]
+            good += len(line) + 1
+        if good < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def add(self, start, results):
+        self._write({"start": start, "results": results})
+        self.shards[start] = results
+
+    def close(self):
+        self.file.close()
+
+
+class Ratings:
+    # Multinomial logit over the winner of each game: the seat holding policy p
+    # wins with probability proportional to exp(rating[p] + seat_bias[seat]).
+    # Seat bias is fitted alongside, since seats are far from fair. Ratings are
+    # MAP estimates under a weak normal prior, shown on the Elo scale with 95%
+    # intervals from the curvature of the posterior.
+    def __init__(self, policy_names):
+        self.names = list(policy_names)
+        self.table = seatings(len(self.names))
+        self.wins = np.zeros((len(self.table), len(PLAYER_SEATS)), dtype=np.int64) # seating -> wins by seat
+        self.games = 0
+        self.unfinished = 0
+        self.turns = 0
+        self._theta = None
+
+    def add_shard(self, start, results):
+        for offset, (winner, turns) in enumerate(results):
+            self.games += 1
+            self.turns += turns
+            if winner < 0:
+                self.unfinished += 1
+            else:
+                self.wins[(start + offset) % len(self.table), winner] += 1
+
+    def _features(self):
+        # features[seating, seat] = one-hot policy followed by one-hot seat (seat 1 is the reference)
+        n_policies, n_seats = len(self.names), len(PLAYER_SEATS)
+        features = np.zeros((len(self.table), n_seats, n_policies + n_seats - 1))
+        for index, seating in enumerate(self.table):
+            for seat, policy in enumerate(seating):
+                features[index, seat, policy] = 1.0
+                if seat:
+                    features[index, seat, n_policies + seat - 1] = 1.0
+        return features
+
+    def fit(self, iterations=50, tolerance=1e-9):
+        # Newton's method on the log posterior; returns its covariance
+        features = self._features()
+        wins = self.wins.astype(float)
+        counts = wins.sum(axis=1)
+        theta = self._theta if self._theta is not None else np.zeros(features.shape[2])
+        prior = np.eye(len(theta)) / PRIOR_SD ** 2
+        for _ in range(iterations):
+            logits = features @ theta
+            logits -= logits.max(axis=1, keepdims=True)
+            probs = np.exp(logits)
+            probs /= probs.sum(axis=1, keepdims=True)
+            gradient = np.einsum("sk,skp->p", wins - counts[:, None] * probs, features) - prior @ theta
+            mean = np.einsum("sk,skp->sp", probs, features)
+            hessian = (np.einsum("s,sk,skp,skq->pq", counts, probs, features, features)
+                       - np.einsum("s,sp,sq->pq", counts, mean, mean) + prior)
+            step = np.linalg.solve(hessian, gradient)
+            theta = theta + step
+            if np.abs(step).max() < tolerance:
+                break
+        self._theta = theta # Warm start for the next fit
+        return theta, np.linalg.inv(hessian)
+
+    def standings(self):
+        # [(name, elo, half width of the 95% interval, games played, games won)], best first,
+        # and the Elo bias of seats 2-4 relative to seat 1
+        theta, covariance = self.fit()
+        n_policies = len(self.names)
+        center = np.eye(n_policies) - 1.0 / n_policies # Ratings are reported relative to their mean
+        ratings = center @ theta[:n_policies]
+        errors = np.sqrt(np.diag(center @ covariance[:n_policies, :n_policies] @ center.T))
+
+        played = [0] * n_policies
+        won = [0] * n_policies
+        per_seating = self.wins.sum(axis=1)
+        for index, seating in enumerate(self.table):
+            for policy in set(seating):
+                played[policy] += int(per_seating[index])
+            for seat, policy in enumerate(seating):
+                won[policy] += int(self.wins[index, seat])
+
+        rows = [(name, ELO_BASE + ELO_SCALE * ratings[policy], Z95 * ELO_SCALE * errors[policy], played[policy], won[policy])
+                for policy, name in enumerate(self.names)]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows, [0.0] + list(ELO_SCALE * theta[n_policies:])
+
+
+def format_standings(ratings):
+    rows, seat_bias = ratings.standings()
+    lines = [f"{'policy':12} {'elo':>7} {'95% ci':>8} {'games':>8} {'wins':>8}"]
+    for name, elo, margin, played, won in rows:
+        lines.append(f"{name:12} {elo:>7.0f} {'±' + format(margin, '.0f'):>8} {played:>8} {won:>8}")
+    colors = ", ".join(f"{color} {bias:+.0f}" for (_, color), bias in zip(PLAYER_SEATS, seat_bias))
+    lines.append(f"Seat bias (elo): {colors}")
+    lines.append(f"{ratings.games} games, {ratings.unfinished} unfinished, "
+                 f"{ratings.turns / ratings.games if ratings.games else 0:.1f} turns/game")
+    return "\n".join(lines)
+
+
+def run_tournament(policy_names, rounds, seed=0, workers=None, checkpoint=None, shard_size=SHARD_SIZE,
+                   max_turns=MAX_TURNS, dice="batched", think=0.1, progress=None):
+    # Plays every seating `rounds` times. Finished shards are appended to the
+    # checkpoint file, and a rerun with the same settings only plays the rest.
+    policy_names = list(policy_names)
+    if len(set(policy_names)) < 2:
+        raise ValueError("A tournament needs at least two different policies")
+    workers = workers or os.cpu_count() or 1
+    total = len(seatings(len(policy_names))) * rounds
+    shards = [(start, min(shard_size, total - start)) for start in range(0, total, shard_size)]
+
+    ratings = Ratings(policy_names)
+    store = None
+    if checkpoint:
+        header = {"tournament": 1, "policies": policy_names, "rounds": rounds, "seed": seed, "shard_size": shard_size,
+                  "max_turns": max_turns, "dice": dice, "think": think}
+        store = Checkpoint(checkpoint, header)
+        for start, results in store.shards.items():
+            ratings.add_shard(start, results)
+    remaining = [(policy_names, start, size, seed, max_turns, dice, think)
+                 for start, size in shards if store is None or start not in store.shards]
+
+    try:
+        for start, results in iter_tasks(run_shard, remaining, workers):
+            if store is not None:
+                store.add(start, results)
+            ratings.add_shard(start, results)
+            if progress:
+                progress(ratings, total)
+    finally:
+        if store is not None:
+            store.close()
+    return ratings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin Ludo tournament between policies, with Elo ratings.")
+    parser.add_argument("-p", "--policy", action="append", required=True,
+                        help=f"Policy to enter, at least two ({', '.join(sorted(POLICIES))})")
+    parser.add_argument("-r", "--rounds", type=int, default=4, help="Games per seating of the policies")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-c", "--checkpoint", default=None, help="Results file; rerun with it to resume")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--dice", choices=sorted(DICE), default="batched")
+    parser.add_argument("--think", type=float, default=0.1, help="Seconds a search bot may spend per move")
+    args = parser.parse_args(argv)
+
+    for name in args.policy:
+        make_policy(name) # Fail fast on a bad name, before spawning workers
+
+    started = time.perf_counter()
+    last_report = [started]
+
+    def progress(ratings, total):
+        now = time.perf_counter()
+        if now - last_report[0] < 1.0 and ratings.games < total:
+            return
+        last_report[0] = now
+        leader, elo, margin, _, _ = ratings.standings()[0][0]
+        print(f"\r{ratings.games}/{total} games, leader {leader} {elo:.0f} ±{margin:.0f}", end="", flush=True)
+
+    try:
+        ratings = run_tournament(args.policy, args.rounds, args.seed, args.workers, args.checkpoint, args.shard_size,
+                                 args.max_turns, args.dice, args.think, progress)
+    except ValueError as error:
+        parser.error(str(error))
+    except KeyboardInterrupt:
+        print("\nInterrupted." + (" Rerun the same command to resume." if args.checkpoint else ""))
+        return 1
+    print(f"\n{format_standings(ratings)}")
+    print(f"Took {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
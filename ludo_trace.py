@@ -0,0 +1,249 @@
+import argparse
+import functools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from ludo_dice import SeededDice
+from ludo_game import LudoGame
+
+
+TRACE_SIZE = 200000 # Trace events kept; older ones are dropped
+SUB_BUCKETS = 4 # Histogram buckets per power of two (about 19% wide)
+
+# (class, method, category) timed while a Profiler is enabled
+HOT_PATHS = (
+    (LudoGame, "roll_dice", "engine"),
+    (LudoGame, "move_piece", "engine"),
+    (LudoGame, "get_movable_pieces", "engine"),
+    (LudoGame, "legal_moves", "engine"),
+    (LudoGame, "game_state", "engine"),
+)
+
+# LudoGUI methods timed as well by enable(gui=True); headless profiles never
+# import ludo_gui, so they run without tkinter
+GUI_HOT_PATHS = ("update_gui", "render_board")
+
+# LudoGUI Tk callbacks whose latency is measured from entry until Tk is idle
+# again, i.e. after the redraw they caused
+TK_CALLBACKS = ("roll_dice", "handle_piece_click", "reset_game", "_play_bot_step")
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile of an already sorted list; None when it is empty
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Histogram:
+    # Log-linear histogram of durations in ns: SUB_BUCKETS buckets per power of two
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.buckets = [0] * (64 * SUB_BUCKETS)
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if ns > self.max:
+            self.max = ns
+        if ns < SUB_BUCKETS:
+            self.buckets[ns] += 1
+        else:
+            bits = ns.bit_length()
+            self.buckets[(bits - 2) * SUB_BUCKETS + (ns >> (bits - 3)) - SUB_BUCKETS] += 1
+
+    @staticmethod
+    def bucket_floor(index):
+        if index < SUB_BUCKETS:
+            return index
+        bits = index // SUB_BUCKETS + 2
+        return (SUB_BUCKETS + index % SUB_BUCKETS) << (bits - 3)
+
+    def percentile(self, pct):
+        # Lower edge of the bucket holding the pct-th percentile, clamped to min/max
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * pct // 100))
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(max(self.bucket_floor(index), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class Profiler:
+    # Opt-in instrumentation: enable() swaps timing wrappers into HOT_PATHS
+    # (and GUI_HOT_PATHS and TK_CALLBACKS with gui=True), disable() puts the
+    # original methods back, so nothing is paid while it is off. Only one
+    # profiler can be enabled at a time.
+    _active = None
+
+    def __init__(self, trace=True, trace_size=TRACE_SIZE):
+        self.histograms = {}
+        self.events = deque(maxlen=trace_size) if trace else None # (name, category, start ns, duration ns, thread id)
+        self.origin = time.perf_counter_ns()
+        self._saved = []
+
+    def enable(self, gui=False):
+        if Profiler._active is not None:
+            raise RuntimeError("Another Profiler is already enabled")
+        Profiler._active = self
+        for cls, name, category in HOT_PATHS:
+            self._patch(cls, name, self._timed(f"{cls.__name__}.{name}", category, cls.__dict__[name]))
+        if not gui:
+            return self
+        from ludo_gui import LudoGUI
+        for name in GUI_HOT_PATHS:
+            self._patch(LudoGUI, name, self._timed(f"LudoGUI.{name}", "gui", LudoGUI.__dict__[name]))
+        for name in TK_CALLBACKS:
+            self._patch(LudoGUI, name, self._tk_callback(f"tk.{name}", LudoGUI.__dict__[name]))
+        return self
+
+    def disable(self):
+        for cls, name, original in reversed(self._saved):
+            setattr(cls, name, original)
+        self._saved.clear()
+        if Profiler._active is self:
+            Profiler._active = None
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _patch(self, cls, name, wrapper):
+        self._saved.append((cls, name, cls.__dict__[name]))
+        setattr(cls, name, wrapper)
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def record(self, name, category, start, duration):
+        self._histogram(name).add(duration)
+        if self.events is not None:
+            self.events.append((name, category, start, duration, threading.get_ident()))
+
+    def _timed(self, name, category, func):
+        clock = time.perf_counter_ns
+        histogram = self._histogram(name)
+        events = self.events
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = clock() - start
+                histogram.add(duration)
+                if events is not None:
+                    events.append((name, category, start, duration, threading.get_ident()))
+        return wrapper
+
+    def _tk_callback(self, name, func):
+        clock = time.perf_counter_ns
+        timed = self._timed(name, "tk", func)
+        latency_name = f"{name} latency"
+
+        @functools.wraps(func)
+        def wrapper(gui, *args, **kwargs):
+            start = clock()
+            try:
+                return timed(gui, *args, **kwargs)
+            finally:
+                # Idle callbacks run in order, after the redraw this callback queued
+                after_idle = getattr(gui.master, "after_idle", None)
+                if after_idle is not None:
+                    after_idle(lambda: self.record(latency_name, "tk", start, clock() - start))
+        return wrapper
+
+    def reset(self):
+        self.histograms.clear()
+        if self.events is not None:
+            self.events.clear()
+        self.origin = time.perf_counter_ns()
+
+    def summary_rows(self):
+        # (name, calls, total ms, mean us, p50 us, p90 us, p99 us, max us), slowest total first
+        rows = []
+        for name, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            rows.append((name, histogram.count, histogram.total / 1e6, histogram.mean() / 1e3,
+                         histogram.percentile(50) / 1e3, histogram.percentile(90) / 1e3,
+                         histogram.percentile(99) / 1e3, histogram.max / 1e3))
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def summary(self):
+        lines = [f"{'name':34} {'calls':>9} {'total ms':>10} {'mean us':>9} {'p50 us':>9} {'p90 us':>9} {'p99 us':>9} {'max us':>9}"]
+        for name, calls, total_ms, mean, p50, p90, p99, worst in self.summary_rows():
+            lines.append(f"{name:34} {calls:>9} {total_ms:>10.2f} {mean:>9.2f} {p50:>9.2f} {p90:>9.2f} {p99:>9.2f} {worst:>9.2f}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        # Trace Event Format, loadable in chrome://tracing or Perfetto
+        pid = os.getpid()
+        events = [{"name": name, "cat": category, "ph": "X", "ts": (start - self.origin) / 1e3,
+                   "dur": duration / 1e3, "pid": pid, "tid": tid}
+                  for name, category, start, duration, tid in self.events or ()]
+        return {"traceEvents": events, "displayTimeUnit": "ns"}
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def profile_games(n_games=100, seed=0, trace=True):
+    # Headless run of seeded random games under a profiler
+    from ludo_sim import RandomPolicy, play_turn
+
+    rng = random.Random(seed)
+    profiler = Profiler(trace=trace)
+    with profiler:
+        for _ in range(n_games):
+            game = LudoGame(SeededDice(rng.getrandbits(63)))
+            policies = [RandomPolicy(rng.getrandbits(64))] * 4
+            while not game.is_game_over():
+                play_turn(game, policies)
+                game.game_state()
+    return profiler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the Ludo engine on headless games.")
+    parser.add_argument("-n", "--games", type=int, default=100)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Write a Chrome trace-event JSON file")
+    args = parser.parse_args(argv)
+
+    profiler = profile_games(args.games, args.seed, trace=bool(args.output))
+    print(profiler.summary())
+    if args.output:
+        profiler.write_trace(args.output)
+        print(f"Wrote {len(profiler.events)} trace events to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
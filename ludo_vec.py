@@ -0,0 +1,182 @@
+import argparse
+import time
+
+import numpy as np
+
+from ludo_rules import ENTER, FINISH, MOVE, MOVE_DESTINATIONS, MOVE_OUTCOMES, MOVE_TABLE_SHAPE, MOVED_OUTCOMES, NEEDS_SIX
+from ludo_state import CURRENT, FINISHED, GAME_OVER, PIECES, SIXES, STATE_SIZE, GameState
+
+
+# MOVE_TABLE as arrays indexed [seat, position, roll]
+OUTCOMES = np.frombuffer(MOVE_OUTCOMES, dtype=np.uint8).reshape(MOVE_TABLE_SHAPE)
+DESTINATIONS = np.frombuffer(MOVE_DESTINATIONS, dtype=np.uint8).reshape(MOVE_TABLE_SHAPE)
+MOVED = np.isin(np.arange(OUTCOMES.max() + 1), MOVED_OUTCOMES)
+
+POLICIES = ("first", "random")
+SEATS = np.arange(4)
+
+
+class VecLudo:
+    # N games stepped in lockstep: every step rolls once for each unfinished game
+    # and applies the same turn flow as ludo_sim.play_turn.
+    def __init__(self, n_games, seed=None, policy="first", max_steps=5000, record_rolls=False):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of: {', '.join(POLICIES)}")
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+        self.policy = policy
+        self.max_steps = max_steps
+        self.pieces = np.zeros((n_games, 4, 4), dtype=np.uint8)
+        self.current = np.zeros(n_games, dtype=np.int64)
+        self.sixes = np.zeros((n_games, 4), dtype=np.uint8)
+        self.finished = np.zeros((n_games, 4), dtype=np.uint8)
+        self.game_over = np.zeros(n_games, dtype=bool)
+        self.active = np.arange(n_games) # Indices of games still being played
+        self.steps = 0
+        self.game_steps = 0 # Sum over steps of games stepped
+        self.rolls = [] if record_rolls else None
+
+    def done(self):
+        return not len(self.active) or self.steps >= self.max_steps
+
+    def step(self):
+        games = self.active
+        rolls = self.rng.integers(1, 7, size=len(games), dtype=np.int64)
+        if self.rolls is not None:
+            recorded = np.zeros(self.n_games, dtype=np.uint8)
+            recorded[games] = rolls
+            self.rolls.append(recorded)
+        self.steps += 1
+        self.game_steps += len(games)
+
+        cur = self.current[games]
+        advance = np.ones(len(games), dtype=bool)
+
+        # Six streaks; the third six in a row forfeits the turn (LudoGame.roll_dice)
+        is_six = rolls == 6
+        streak = np.where(is_six, self.sixes[games, cur] + 1, 0)
+        lost_turn = streak == 3
+        streak[lost_turn] = 0
+        self.sixes[games, cur] = streak
+
+        # Movable pieces, as LudoGame.legal_moves: only moves move_piece makes
+        own = self.pieces[games, cur].astype(np.int64)
+        movable = MOVED[OUTCOMES[cur[:, None], own, rolls[:, None]]]
+        movable &= ~lost_turn[:, None]
+        can_move = movable.any(axis=1)
+
+        if self.policy == "first":
+            choice = movable.argmax(axis=1)
+        else:
+            choice = (self.rng.random(movable.shape) * movable).argmax(axis=1)
+
+        sel = np.flatnonzero(can_move)
+        g = games[sel]
+        seat = cur[sel]
+        piece = choice[sel]
+        roll = rolls[sel]
+        position = own[sel, piece]
+        outcome = OUTCOMES[seat, position, roll]
+        destination = DESTINATIONS[seat, position, roll]
+
+        moved = MOVED[outcome]
+        self.pieces[g[moved], seat[moved], piece[moved]] = destination[moved]
+
+        finishing = outcome == FINISH
+        self.finished[g[finishing], seat[finishing]] += 1
+        self.game_over[g[finishing]] = self.finished[g[finishing], seat[finishing]] == 4
+
+        capturing = np.flatnonzero(outcome == MOVE)
+        if len(capturing):
+            cg = g[capturing]
+            board = self.pieces[cg]
+            hit = (board == destination[capturing, None, None]) & (SEATS[None, :, None] != seat[capturing, None, None])
+            board[hit] = 0
+            self.pieces[cg] = board
+
+        # Same player rolls again after a 6 (or after entering); a failed
+        # move out of base always passes the turn
+        advance[sel] = (outcome == NEEDS_SIX) | ((outcome != ENTER) & (roll != 6))
+        self.current[games] = np.where(advance, (cur + 1) % 4, cur)
+
+        self.active = games[~self.game_over[games]]
+
+    def run(self):
+        while not self.done():
+            self.step()
+        return self
+
+    def winners(self):
+        # Winning seat per game, -1 where the game did not finish
+        won = self.finished == 4
+        return np.where(won.any(axis=1), won.argmax(axis=1), -1)
+
+    def state(self, game_idx):
+        data = bytearray(STATE_SIZE)
+        data[PIECES:PIECES + 16] = self.pieces[game_idx].tobytes()
+        data[CURRENT] = int(self.current[game_idx])
+        data[SIXES:SIXES + 4] = self.sixes[game_idx].tobytes()
+        data[FINISHED:FINISHED + 4] = self.finished[game_idx].tobytes()
+        data[GAME_OVER] = bool(self.game_over[game_idx])
+        return GameState(data)
+
+
+def check_parity(n_games=200, seed=0, max_steps=400):
+    # Replays every vectorized game through the scalar LudoGame with the same
+    # dice and the same "first movable piece" policy; returns mismatching games.
+    from ludo_dice import ScriptedDice
+    from ludo_game import LudoGame
+    from ludo_sim import first_movable, play_turn
+
+    vec = VecLudo(n_games, seed=seed, policy="first", max_steps=max_steps, record_rolls=True).run()
+    rolls = np.stack(vec.rolls, axis=1) if vec.rolls else np.zeros((n_games, 0), dtype=np.uint8)
+    policies = [first_movable] * 4
+
+    mismatches = []
+    for game_idx in range(n_games):
+        game_rolls = [int(roll) for roll in rolls[game_idx] if roll]
+        game = LudoGame(ScriptedDice(game_rolls))
+        for _ in game_rolls:
+            play_turn(game, policies)
+        if game.state != vec.state(game_idx):
+            mismatches.append(game_idx)
+    return mismatches
+
+
+def benchmark(sizes, seed=0, policy="random", max_steps=5000):
+    results = []
+    for n_games in sizes:
+        vec = VecLudo(n_games, seed=seed, policy=policy, max_steps=max_steps)
+        started = time.perf_counter()
+        vec.run()
+        elapsed = time.perf_counter() - started
+        finished = int((vec.winners() >= 0).sum())
+        results.append((n_games, vec.steps, vec.game_steps, finished, elapsed))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized lockstep Ludo simulator.")
+    parser.add_argument("-n", "--games", type=int, action="append", default=None,
+                        help="Games per batch, repeat to compare sizes (default: 1000, 10000, 100000)")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--parity", action="store_true", help="Check parity with the scalar LudoGame and exit")
+    args = parser.parse_args(argv)
+
+    if args.parity:
+        mismatches = check_parity(seed=args.seed)
+        print("parity OK" if not mismatches else f"parity FAILED for games {mismatches[:20]}")
+        return 1 if mismatches else 0
+
+    for n_games, steps, game_steps, finished, elapsed in benchmark(args.games or [1000, 10000, 100000],
+                                                                   args.seed, args.policy, args.max_steps):
+        print(f"N={n_games:>7}: {steps} steps in {elapsed:.2f}s, {steps / elapsed:,.0f} steps/sec, "
+              f"{game_steps / elapsed:,.0f} game-steps/sec, {finished / elapsed:,.0f} games/sec "
+              f"({finished} finished)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+POLL_MS = 20 # How often the Tk loop checks for finished jobs while any are running
+
+
+class GuiWorker:
+    # Runs slow work (bot searches, estimates) off the Tk thread. Jobs get
+    # snapshots rather than the live game; finished results are handed back
+    # through a queue that the Tk loop drains with master.after(), so callbacks
+    # always run on the Tk thread. cancel() drops every job submitted before it.
+    def __init__(self, master, executor=None, poll_ms=POLL_MS):
+        self.master = master
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1, thread_name_prefix="ludo-worker")
+        self.poll_ms = poll_ms
+        self.results = queue.SimpleQueue() # (generation, on_done, on_error, future)
+        self.generation = 0
+        self._futures = set()
+        self._poll_after = None
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        # fn(*args) runs on the worker; on_done(result) or on_error(exc) later runs on the Tk thread
+        generation = self.generation
+        future = self.executor.submit(fn, *args)
+        self._futures.add(future)
+        future.add_done_callback(lambda done: self.results.put((generation, on_done, on_error, done)))
+        if self._poll_after is None:
+            self._poll_after = self.master.after(self.poll_ms, self._poll)
+        return future
+
+    def pending(self):
+        return len(self._futures)
+
+    def cancel(self):
+        # Forget every submitted job: queued ones are cancelled, running ones finish but are ignored
+        self.generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures.clear()
+
+    def _poll(self):
+        self._poll_after = None
+        try:
+            while True:
+                try:
+                    generation, on_done, on_error, future = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                self._futures.discard(future)
+                if generation != self.generation or future.cancelled():
+                    continue
+                error = future.exception()
+                if error is not None:
+                    if on_error is None:
+                        raise error # Reported by Tk like any other callback error
+                    on_error(error)
+                elif on_done is not None:
+                    on_done(future.result())
+        finally:
+            if self._futures and self._poll_after is None:
+                self._poll_after = self.master.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        self.cancel()
+        if self._poll_after is not None:
+            self.master.after_cancel(self._poll_after)
+            self._poll_after = None
+        self.executor.shutdown(wait=False, cancel_futures=True)